@@ -2,14 +2,40 @@
 API Routes for the Video DJ Playlist Creator.
 """
 
-from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from typing import Callable, Optional, List, Dict, Set
+from collections import OrderedDict, defaultdict, deque
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response
+from sqlalchemy.orm import Session, joinedload, raiseload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import case, func, insert, literal, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+import os
+import re
+import json
+import time
+import logging
 import uuid
+import asyncio
+import threading
+from functools import lru_cache
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait
 from datetime import datetime
 
-from models.database import get_db, Song, Segment, Playlist, PlaylistItem
+# Optional: C JSON codec for chat frames, plan fields and job payloads
+try:
+    import orjson
+
+    def json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    json_loads = orjson.loads
+    ORJSON_AVAILABLE = True
+except ImportError:
+    json_dumps = json.dumps
+    json_loads = json.loads
+    ORJSON_AVAILABLE = False
+
+from models.database import get_db, get_async_db, background_session, new_session, get_library_version, get_playlist_version, Song, Segment, Playlist, PlaylistItem, PlaylistDJContext
 from schemas import (
     SongResponse,
     SongDetailResponse,
@@ -32,15 +58,36 @@ from schemas import (
     HealthResponse,
     ErrorResponse,
     SegmentBrief,
+    as_response,
+    from_row,
 )
-from services.discovery import discover_all_songs, DiscoveredSong
+from services.discovery import discover_all_songs, discover_all_songs_async, DiscoveredSong
 from services.downloader import download_audio, get_cache_stats
-from services.analysis import analyze_audio_file, DetectedSegment
-from config import settings, SUPPORTED_LANGUAGES
-from pydantic import BaseModel
+from services.analysis import analyze_audio_file, segments_to_insert_rows, DetectedSegment
+from services.job_store import checkpoint_job, get_job, TERMINAL_STATUSES as _TERMINAL_STATUSES
+from services.search_cache import get_cached_search, cache_search, normalize_query
+from config import settings, SUPPORTED_LANGUAGES, SUPPORTED_LANGUAGES_SET
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter()
 
+# Concurrent audio downloads when analyzing many songs at once
+ANALYSIS_DOWNLOAD_WORKERS = 4
+
+# AI export progress log. main.py routes it through a queue so writes happen
+# on a listener thread instead of the export and search workers.
+export_log = logging.getLogger("ai_export")
+
+# Concurrent yt-dlp searches when resolving AI plan songs to videos
+YOUTUBE_SEARCH_WORKERS = 8
+
+# Concurrent video downloads in an AI export; kept low to avoid YouTube throttling
+YOUTUBE_DOWNLOAD_WORKERS = 4
+
+# ffmpeg threads per segment encode when AI export segments are encoded in parallel
+SEGMENT_ENCODE_THREADS = 2
+
 
 # ============== DJ Context ==============
 
@@ -53,42 +100,80 @@ class DJContextRequest(BaseModel):
     custom_shoutouts: Optional[List[str]] = []
 
 
-# In-memory store for DJ context (per-playlist)
-dj_contexts = {}
+# Context used when a playlist has no saved DJ context
+DEFAULT_DJ_CONTEXT = {
+    "theme": "New Year 2025 Party - Welcoming 2026!",
+    "mood": "energetic, celebratory, festive",
+    "audience": "party guests ready to dance",
+    "special_notes": "",
+    "custom_shoutouts": ["Happy New Year!", "2026 here we come!"]
+}
+
+
+def load_dj_context(playlist_id: str, db: Session) -> dict:
+    """Get the saved DJ context for a playlist, or the default one."""
+    raw = db.query(PlaylistDJContext.context).filter(PlaylistDJContext.playlist_id == playlist_id).scalar()
+    return json_loads(raw) if raw else dict(DEFAULT_DJ_CONTEXT)
 
 
 # ============== Health Check ==============
 
-@router.get("/health", response_model=HealthResponse)
-async def health_check():
-    """Check system health and dependencies."""
-    import shutil
+# Seconds a computed cache size is reused by the health check
+CACHE_SIZE_TTL = 10
+
+
+@lru_cache(maxsize=1)
+def get_ffmpeg_status() -> tuple:
+    """Check FFmpeg once per process. Returns (installed, version)."""
     import subprocess
     
-    # Check FFmpeg
-    ffmpeg_installed = False
-    ffmpeg_version = None
     try:
         result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
         if result.returncode == 0:
-            ffmpeg_installed = True
             # Extract version from first line
             first_line = result.stdout.split('\n')[0]
-            ffmpeg_version = first_line.split(' ')[2] if len(first_line.split(' ')) > 2 else "unknown"
+            return True, first_line.split(' ')[2] if len(first_line.split(' ')) > 2 else "unknown"
     except FileNotFoundError:
         pass
+    return False, None
+
+
+def get_directory_size(path: str) -> int:
+    """Total size in bytes of all files under a directory."""
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    total += get_directory_size(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    except (FileNotFoundError, NotADirectoryError, PermissionError):
+        pass
+    return total
+
+
+@lru_cache(maxsize=1)
+def _cache_size_mb(time_bucket: int) -> float:
+    """Cache size in MB, memoized per CACHE_SIZE_TTL time bucket."""
+    cache_dirs = [settings.audio_cache_dir, settings.video_cache_dir, settings.thumbnail_cache_dir]
+    return sum(get_directory_size(str(cache_dir)) for cache_dir in cache_dirs) / (1024 ** 2)
+
+
+@router.get("/health", response_model=HealthResponse)
+async def health_check():
+    """Check system health and dependencies."""
+    import shutil
+    
+    # Check FFmpeg
+    ffmpeg_installed, ffmpeg_version = get_ffmpeg_status()
     
     # Check disk space
     total, used, free = shutil.disk_usage(settings.base_dir)
     disk_space_gb = free / (1024 ** 3)
     
     # Calculate cache size
-    cache_size_mb = 0
-    for cache_dir in [settings.audio_cache_dir, settings.video_cache_dir, settings.thumbnail_cache_dir]:
-        if cache_dir.exists():
-            for file in cache_dir.rglob('*'):
-                if file.is_file():
-                    cache_size_mb += file.stat().st_size / (1024 ** 2)
+    cache_size_mb = _cache_size_mb(int(time.time() // CACHE_SIZE_TTL))
     
     # Check Azure OpenAI availability
     openai_available = False
@@ -120,24 +205,66 @@ async def health_check():
     )
 
 
+# ============== Query Helpers ==============
+
+# Largest id list bound into one IN (...) clause; longer lists are queried
+# in slices so the statement stays well under SQLite's variable limit
+IN_CLAUSE_CHUNK_SIZE = 900
+
+# The reorder UPDATE ... CASE binds each id three times (WHEN, THEN and IN)
+CASE_UPDATE_CHUNK_SIZE = 300
+
+
+def chunked(ids, size: int = IN_CLAUSE_CHUNK_SIZE) -> List[list]:
+    """Split ids into lists of at most size items."""
+    ids = list(ids)
+    return [ids[start:start + size] for start in range(0, len(ids), size)]
+
+
 # ============== Songs ==============
 
+# Default page sizes for the list endpoints
+SONG_PAGE_SIZE = 500
+SEGMENT_PAGE_SIZE = 1000
+
+# Serialized song list pages, keyed by query params and library version (LRU)
+SONG_LIST_CACHE_SIZE = 64
+_song_list_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+
+# Columns needed to build a SongResponse
+SONG_LIST_COLUMNS = (
+    Song.id, Song.title, Song.artist, Song.language, Song.duration,
+    Song.thumbnail_url, Song.youtube_url, Song.bpm, Song.energy_score,
+    Song.analysis_status, Song.created_at,
+)
+
 @router.get("/songs", response_model=SongListResponse)
 async def list_songs(
     language: Optional[str] = None,
     status: Optional[str] = None,
     sort: str = "created_at",
     order: str = "desc",
-    db: Session = Depends(get_db)
+    limit: int = SONG_PAGE_SIZE,
+    offset: int = 0,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List all songs with optional filters."""
-    query = db.query(Song)
+    """List songs with optional filters, one page at a time."""
+    cache_key = (language, status, sort, order, limit, offset, get_library_version())
+    cached = _song_list_cache.get(cache_key)
+    if cached is not None:
+        _song_list_cache.move_to_end(cache_key)
+        return Response(content=cached, media_type="application/json")
+    
+    # Only the columns the response needs
+    query = select(*SONG_LIST_COLUMNS)
     
     # Apply filters
+    filters = []
     if language:
-        query = query.filter(Song.language == language)
+        filters.append(Song.language == language)
     if status:
-        query = query.filter(Song.analysis_status == status)
+        filters.append(Song.analysis_status == status)
+    query = query.where(*filters)
     
     # Apply sorting
     sort_column = getattr(Song, sort, Song.created_at)
@@ -146,149 +273,141 @@ async def list_songs(
     else:
         query = query.order_by(sort_column.asc())
     
-    songs = query.all()
+    songs = (await db.execute(query.limit(limit).offset(offset))).all()
+    total = (await db.execute(select(func.count()).select_from(Song).where(*filters))).scalar_one()
+    
+    # Get language counts in one grouped query
+    counts_by_language = dict(
+        (await db.execute(select(Song.language, func.count()).group_by(Song.language))).all()
+    )
+    language_counts = {lang: counts_by_language.get(lang, 0) for lang in SUPPORTED_LANGUAGES}
     
-    # Get language counts
-    language_counts = {}
-    for lang in SUPPORTED_LANGUAGES:
-        count = db.query(Song).filter(Song.language == lang).count()
-        language_counts[lang] = count
+    # Get segment counts for the songs on this page in one grouped query
+    segment_counts = {}
+    for song_ids in chunked(song.id for song in songs):
+        segment_counts.update((await db.execute(
+            select(Segment.song_id, func.count(Segment.id))
+            .where(Segment.song_id.in_(song_ids))
+            .group_by(Segment.song_id)
+        )).all())
     
     # Build response
-    song_responses = []
-    for song in songs:
-        segment_count = db.query(Segment).filter(Segment.song_id == song.id).count()
-        song_responses.append(SongResponse(
-            id=song.id,
-            title=song.title,
-            artist=song.artist,
-            language=song.language,
-            duration=song.duration,
-            thumbnail_url=song.thumbnail_url,
-            youtube_url=song.youtube_url,
-            bpm=song.bpm,
-            energy_score=song.energy_score,
-            analysis_status=song.analysis_status,
-            segment_count=segment_count,
-            created_at=song.created_at
-        ))
+    song_responses = [
+        from_row(SongResponse, song, segment_count=segment_counts.get(song.id, 0))
+        for song in songs
+    ]
     
-    return SongListResponse(
+    body = SongListResponse(
         songs=song_responses,
-        total=len(songs),
+        total=total,
         languages=language_counts
-    )
+    ).model_dump_json().encode()
+    
+    _song_list_cache[cache_key] = body
+    while len(_song_list_cache) > SONG_LIST_CACHE_SIZE:
+        _song_list_cache.popitem(last=False)
+    
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/songs/{song_id}", response_model=SongDetailResponse)
-async def get_song(song_id: str, db: Session = Depends(get_db)):
+async def get_song(song_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get a single song with all details."""
-    song = db.query(Song).filter(Song.id == song_id).first()
+    song = await db.get(Song, song_id)
     if not song:
         raise HTTPException(status_code=404, detail={"error": "SONG_NOT_FOUND", "message": f"Song with ID '{song_id}' not found"})
     
-    segments = db.query(Segment).filter(Segment.song_id == song_id).order_by(Segment.start_time).all()
+    segments = (await db.execute(
+        select(Segment).where(Segment.song_id == song_id).order_by(Segment.start_time)
+    )).scalars().all()
     
-    return SongDetailResponse(
-        id=song.id,
-        title=song.title,
-        artist=song.artist,
-        language=song.language,
-        duration=song.duration,
-        thumbnail_url=song.thumbnail_url,
-        youtube_url=song.youtube_url,
-        bpm=song.bpm,
-        energy_score=song.energy_score,
-        analysis_status=song.analysis_status,
+    return as_response(from_row(
+        SongDetailResponse, song,
         segment_count=len(segments),
-        segments=[SegmentBrief(
-            id=seg.id,
-            start_time=seg.start_time,
-            end_time=seg.end_time,
-            duration=seg.duration,
-            energy_score=seg.energy_score,
-            is_primary=seg.is_primary,
-            label=seg.label
-        ) for seg in segments],
-        cached_audio_path=song.cached_audio_path,
-        cached_video_path=song.cached_video_path,
-        created_at=song.created_at,
-        updated_at=song.updated_at
-    )
+        segments=[from_row(SegmentBrief, seg) for seg in segments]
+    ))
 
 
 # ============== Discovery ==============
 
+# Rows per multi-row INSERT; keeps bound parameters under SQLite's limit
+INSERT_BATCH_SIZE = 100
+
+
 def save_discovered_songs(songs: List[DiscoveredSong], db: Session) -> int:
     """Save discovered songs to database. Returns count of new songs added."""
+    rows = [
+        {
+            "id": song.id,
+            "title": song.title,
+            "artist": song.artist,
+            "language": song.language,
+            "duration": song.duration,
+            "thumbnail_url": song.thumbnail_url,
+            "youtube_url": song.youtube_url,
+            "analysis_status": "pending"
+        }
+        for song in songs
+    ]
+    
+    # Songs already in the library are skipped by the ON CONFLICT clause
     added = 0
-    for song in songs:
-        existing = db.query(Song).filter(Song.id == song.id).first()
-        if not existing:
-            new_song = Song(
-                id=song.id,
-                title=song.title,
-                artist=song.artist,
-                language=song.language,
-                duration=song.duration,
-                thumbnail_url=song.thumbnail_url,
-                youtube_url=song.youtube_url,
-                analysis_status="pending"
-            )
-            db.add(new_song)
-            added += 1
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        stmt = sqlite_insert(Song).values(rows[start:start + INSERT_BATCH_SIZE])
+        result = db.execute(stmt.on_conflict_do_nothing(index_elements=["id"]))
+        added += result.rowcount
     db.commit()
     return added
 
 
-def run_discovery_task(languages: List[str], songs_per_language: int, db_path: str):
-    """Background task to run song discovery."""
-    from models.database import Database
-    
-    # Create new database connection for background task
-    database = Database(db_path)
-    session = database.get_session()
-    
-    try:
-        all_songs = discover_all_songs(languages=languages, songs_per_language=songs_per_language)
-        
+def save_discovery_results(all_songs: dict):
+    """Save discovered songs for every language from a background thread."""
+    with background_session() as session:
         for language, songs in all_songs.items():
             save_discovered_songs(songs, session)
+
+
+async def run_discovery_task(languages: List[str], songs_per_language: int):
+    """Background task to run song discovery."""
+    try:
+        all_songs = await discover_all_songs_async(languages=languages, songs_per_language=songs_per_language)
+        await asyncio.to_thread(save_discovery_results, all_songs)
         
         print(f"Discovery complete. Added songs for {len(languages)} languages.")
     except Exception as e:
         print(f"Discovery error: {e}")
-    finally:
-        session.close()
+
+
+def validate_languages(languages: List[str]):
+    """Raise a 400 listing every unsupported language."""
+    invalid = set(languages) - SUPPORTED_LANGUAGES_SET
+    if invalid:
+        raise HTTPException(status_code=400, detail={"error": "INVALID_LANGUAGE", "message": f"Unsupported language: {', '.join(sorted(invalid))}"})
+
+
+# Running discovery tasks; referenced here so they aren't garbage collected
+discovery_tasks: Set[asyncio.Task] = set()
 
 
 @router.post("/discover", response_model=DiscoverResponse)
 async def trigger_discovery(
     request: DiscoverRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Trigger song discovery for specified languages."""
     languages = request.languages or SUPPORTED_LANGUAGES
     
-    # Validate languages
-    for lang in languages:
-        if lang not in SUPPORTED_LANGUAGES:
-            raise HTTPException(status_code=400, detail={"error": "INVALID_LANGUAGE", "message": f"Unsupported language: {lang}"})
+    validate_languages(languages)
     
     # If force_refresh, delete existing songs for these languages
     if request.force_refresh:
-        for lang in languages:
-            db.query(Song).filter(Song.language == lang).delete()
+        db.query(Song).filter(Song.language.in_(languages)).delete(synchronize_session=False)
         db.commit()
     
-    # Run discovery in background
-    background_tasks.add_task(
-        run_discovery_task,
-        languages,
-        request.songs_per_language,
-        str(settings.database_path)
-    )
+    # Run discovery as a detached task so the response returns immediately
+    task = asyncio.create_task(run_discovery_task(languages, request.songs_per_language))
+    discovery_tasks.add(task)
+    task.add_done_callback(discovery_tasks.discard)
     
     return DiscoverResponse(
         status="discovering",
@@ -300,20 +419,17 @@ async def trigger_discovery(
 @router.post("/discover/sync", response_model=SongListResponse)
 async def trigger_discovery_sync(
     request: DiscoverRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    async_db: AsyncSession = Depends(get_async_db)
 ):
     """Trigger song discovery synchronously (for testing)."""
     languages = request.languages or SUPPORTED_LANGUAGES
     
-    # Validate languages
-    for lang in languages:
-        if lang not in SUPPORTED_LANGUAGES:
-            raise HTTPException(status_code=400, detail={"error": "INVALID_LANGUAGE", "message": f"Unsupported language: {lang}"})
+    validate_languages(languages)
     
     # If force_refresh, delete existing songs for these languages
     if request.force_refresh:
-        for lang in languages:
-            db.query(Song).filter(Song.language == lang).delete()
+        db.query(Song).filter(Song.language.in_(languages)).delete(synchronize_session=False)
         db.commit()
     
     # Run discovery
@@ -326,19 +442,38 @@ async def trigger_discovery_sync(
         total_added += added
     
     # Return updated song list
-    return await list_songs(db=db)
+    return await list_songs(db=async_db)
 
 
 # ============== Segments ==============
 
 @router.get("/segments")
-async def get_all_segments(db: Session = Depends(get_db)):
-    """Get all segments with their song info."""
-    segments = db.query(Segment).all()
+async def get_all_segments(
+    limit: int = SEGMENT_PAGE_SIZE,
+    offset: int = 0,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get segments with their song info, one page at a time."""
+    segments = (await db.execute(
+        select(
+            Segment.id, Segment.song_id, Segment.start_time, Segment.end_time,
+            Segment.duration, Segment.energy_score, Segment.label, Segment.created_at
+        )
+        .order_by(Segment.created_at, Segment.id)
+        .limit(limit)
+        .offset(offset)
+    )).all()
+    
+    # Load every referenced song with IN queries
+    songs = {}
+    for song_ids in chunked({seg.song_id for seg in segments}):
+        songs.update((song.id, song) for song in await db.execute(
+            select(*SONG_LIST_COLUMNS).where(Song.id.in_(song_ids))
+        ))
     
     result = []
     for seg in segments:
-        song = db.query(Song).filter(Song.id == seg.song_id).first()
+        song = songs.get(seg.song_id)
         result.append({
             "id": seg.id,
             "song_id": seg.song_id,
@@ -367,38 +502,30 @@ async def get_all_segments(db: Session = Depends(get_db)):
 
 
 @router.get("/segments/{song_id}", response_model=SegmentListResponse)
-async def get_segments(song_id: str, db: Session = Depends(get_db)):
+async def get_segments(song_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get all segments for a song."""
-    song = db.query(Song).filter(Song.id == song_id).first()
+    song = await db.get(Song, song_id)
     if not song:
         raise HTTPException(status_code=404, detail={"error": "SONG_NOT_FOUND", "message": f"Song with ID '{song_id}' not found"})
     
-    segments = db.query(Segment).filter(Segment.song_id == song_id).order_by(Segment.start_time).all()
+    segments = (await db.execute(
+        select(Segment).where(Segment.song_id == song_id).order_by(Segment.start_time)
+    )).scalars().all()
     
-    return SegmentListResponse(
+    return as_response(SegmentListResponse(
         song_id=song_id,
-        segments=[SegmentResponse(
-            id=seg.id,
-            song_id=seg.song_id,
-            start_time=seg.start_time,
-            end_time=seg.end_time,
-            duration=seg.duration,
-            energy_score=seg.energy_score,
-            is_primary=seg.is_primary,
-            label=seg.label,
-            cached_clip_path=seg.cached_clip_path
-        ) for seg in segments]
-    )
+        segments=[from_row(SegmentResponse, seg) for seg in segments]
+    ))
 
 
 @router.get("/segments/{segment_id}/preview", response_model=SegmentPreviewResponse)
-async def get_segment_preview(segment_id: str, db: Session = Depends(get_db)):
+async def get_segment_preview(segment_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get preview URL for a segment."""
-    segment = db.query(Segment).filter(Segment.id == segment_id).first()
+    segment = await db.get(Segment, segment_id)
     if not segment:
         raise HTTPException(status_code=404, detail={"error": "SEGMENT_NOT_FOUND", "message": f"Segment with ID '{segment_id}' not found"})
     
-    song = db.query(Song).filter(Song.id == segment.song_id).first()
+    song = await db.get(Song, segment.song_id)
     
     # Build YouTube embed URL with start/end times
     start_int = int(segment.start_time)
@@ -417,41 +544,55 @@ async def get_segment_preview(segment_id: str, db: Session = Depends(get_db)):
 
 # ============== Playlists ==============
 
+# Columns needed to build a PlaylistResponse
+PLAYLIST_LIST_COLUMNS = (
+    Playlist.id, Playlist.name, Playlist.target_duration,
+    Playlist.created_at, Playlist.updated_at,
+)
+
 @router.get("/playlists", response_model=PlaylistListResponse)
-async def list_playlists(db: Session = Depends(get_db)):
+async def list_playlists(db: AsyncSession = Depends(get_async_db)):
     """List all playlists."""
-    playlists = db.query(Playlist).order_by(Playlist.updated_at.desc()).all()
+    # Plain rows: no ORM objects or identity map entries for a read-only list
+    playlists = (await db.execute(
+        select(*PLAYLIST_LIST_COLUMNS).order_by(Playlist.updated_at.desc())
+    )).all()
+    
+    # Item counts and total durations for every playlist in one grouped query
+    totals = {
+        playlist_id: (duration or 0, count)
+        for playlist_id, duration, count in await db.execute(
+            select(
+                PlaylistItem.playlist_id,
+                func.sum(Segment.duration),
+                func.count(PlaylistItem.id)
+            )
+            .outerjoin(Segment, Segment.id == PlaylistItem.segment_id)
+            .group_by(PlaylistItem.playlist_id)
+        )
+    }
     
     playlist_responses = []
     for playlist in playlists:
-        items = db.query(PlaylistItem).filter(PlaylistItem.playlist_id == playlist.id).all()
-        current_duration = sum(
-            db.query(Segment).filter(Segment.id == item.segment_id).first().duration
-            for item in items
-            if db.query(Segment).filter(Segment.id == item.segment_id).first()
-        )
+        current_duration, item_count = totals.get(playlist.id, (0, 0))
         
-        playlist_responses.append(PlaylistResponse(
-            id=playlist.id,
-            name=playlist.name,
-            target_duration=playlist.target_duration,
+        playlist_responses.append(from_row(
+            PlaylistResponse, playlist,
             current_duration=current_duration,
-            item_count=len(items),
-            created_at=playlist.created_at,
-            updated_at=playlist.updated_at
+            item_count=item_count
         ))
     
-    return PlaylistListResponse(
+    return as_response(PlaylistListResponse(
         playlists=playlist_responses,
         total=len(playlists)
-    )
+    ))
 
 
 @router.post("/playlists", status_code=201)
 async def create_playlist(request: PlaylistCreate, db: Session = Depends(get_db)):
     """Create a new playlist with optional segment IDs."""
     playlist = Playlist(
-        id=str(uuid.uuid4()),
+        id=uuid.uuid4().hex,
         name=request.name,
         target_duration=request.target_duration
     )
@@ -464,20 +605,31 @@ async def create_playlist(request: PlaylistCreate, db: Session = Depends(get_db)
 
     # Add segments if provided
     if request.segment_ids:
+        # Look up every requested segment's duration with IN queries
+        durations = {}
+        for segment_ids in chunked(set(request.segment_ids)):
+            durations.update(
+                db.query(Segment.id, Segment.duration)
+                .filter(Segment.id.in_(segment_ids))
+                .all()
+            )
+        
+        items = []
         for position, segment_id in enumerate(request.segment_ids):
-            segment = db.query(Segment).filter(Segment.id == segment_id).first()
-            if segment:
-                item = PlaylistItem(
-                    id=str(uuid.uuid4()),
-                    playlist_id=playlist.id,
-                    segment_id=segment_id,
-                    position=position,
-                    crossfade_duration=2.0
-                )
-                db.add(item)
-                current_duration += segment.duration
-                item_count += 1
+            if segment_id in durations:
+                items.append({
+                    "id": uuid.uuid4().hex,
+                    "playlist_id": playlist.id,
+                    "segment_id": segment_id,
+                    "position": position,
+                    "crossfade_duration": 2.0
+                })
+                current_duration += durations[segment_id]
+        
+        if items:
+            db.execute(insert(PlaylistItem), items)
         db.commit()
+        item_count = len(items)
 
     return {
         "playlist_id": playlist.id,
@@ -492,52 +644,44 @@ async def create_playlist(request: PlaylistCreate, db: Session = Depends(get_db)
 
 
 @router.get("/playlists/{playlist_id}", response_model=PlaylistDetailResponse)
-async def get_playlist(playlist_id: str, db: Session = Depends(get_db)):
+async def get_playlist(playlist_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get a playlist with all items."""
-    playlist = db.query(Playlist).filter(Playlist.id == playlist_id).first()
+    playlist = await db.get(Playlist, playlist_id)
     if not playlist:
         raise HTTPException(status_code=404, detail={"error": "PLAYLIST_NOT_FOUND", "message": f"Playlist with ID '{playlist_id}' not found"})
     
-    items = db.query(PlaylistItem).filter(PlaylistItem.playlist_id == playlist_id).order_by(PlaylistItem.position).all()
+    # Load items with their segment and song in a single joined query
+    items = (await db.execute(
+        select(PlaylistItem)
+        .options(joinedload(PlaylistItem.segment).joinedload(Segment.song), raiseload("*"))
+        .where(PlaylistItem.playlist_id == playlist_id)
+        .order_by(PlaylistItem.position)
+    )).scalars().all()
     
     item_briefs = []
     current_duration = 0
     
     for item in items:
-        segment = db.query(Segment).filter(Segment.id == item.segment_id).first()
+        segment = item.segment
         if segment:
-            song = db.query(Song).filter(Song.id == segment.song_id).first()
+            song = segment.song
             current_duration += segment.duration
             
-            item_briefs.append(PlaylistItemBrief(
-                id=item.id,
-                position=item.position,
-                crossfade_duration=item.crossfade_duration,
-                segment=SegmentBrief(
-                    id=segment.id,
-                    start_time=segment.start_time,
-                    end_time=segment.end_time,
-                    duration=segment.duration,
-                    energy_score=segment.energy_score,
-                    is_primary=segment.is_primary,
-                    label=segment.label
-                ),
+            item_briefs.append(from_row(
+                PlaylistItemBrief, item,
+                segment=from_row(SegmentBrief, segment),
                 song_title=song.title if song else "Unknown",
                 song_artist=song.artist if song else None,
                 song_language=song.language if song else "unknown",
                 song_thumbnail=song.thumbnail_url if song else None
             ))
     
-    return PlaylistDetailResponse(
-        id=playlist.id,
-        name=playlist.name,
-        target_duration=playlist.target_duration,
+    return as_response(from_row(
+        PlaylistDetailResponse, playlist,
         current_duration=current_duration,
         item_count=len(items),
-        items=item_briefs,
-        created_at=playlist.created_at,
-        updated_at=playlist.updated_at
-    )
+        items=item_briefs
+    ))
 
 
 @router.post("/playlists/{playlist_id}/items", response_model=AddPlaylistItemResponse, status_code=201)
@@ -555,7 +699,9 @@ async def add_playlist_item(
     if not segment:
         raise HTTPException(status_code=404, detail={"error": "SEGMENT_NOT_FOUND", "message": f"Segment with ID '{request.segment_id}' not found"})
     
-    # Determine position
+    item_id = uuid.uuid4().hex
+    now = datetime.utcnow().isoformat()
+    
     if request.position is not None:
         position = request.position
         # Shift existing items
@@ -563,33 +709,46 @@ async def add_playlist_item(
             PlaylistItem.playlist_id == playlist_id,
             PlaylistItem.position >= position
         ).update({PlaylistItem.position: PlaylistItem.position + 1})
+        
+        db.add(PlaylistItem(
+            id=item_id,
+            playlist_id=playlist_id,
+            segment_id=request.segment_id,
+            position=position,
+            crossfade_duration=request.crossfade_duration,
+            created_at=now
+        ))
     else:
-        # Append to end
-        max_pos = db.query(func.max(PlaylistItem.position)).filter(
-            PlaylistItem.playlist_id == playlist_id
-        ).scalar()
-        position = (max_pos or -1) + 1
-    
-    item = PlaylistItem(
-        id=str(uuid.uuid4()),
-        playlist_id=playlist_id,
-        segment_id=request.segment_id,
-        position=position,
-        crossfade_duration=request.crossfade_duration
-    )
-    db.add(item)
+        # Append to end: the next position is computed inside the INSERT itself
+        next_item = select(
+            literal(item_id),
+            literal(playlist_id),
+            literal(request.segment_id),
+            func.coalesce(func.max(PlaylistItem.position) + 1, 0),
+            literal(request.crossfade_duration),
+            literal(now)
+        ).where(PlaylistItem.playlist_id == playlist_id)
+        
+        position = db.execute(
+            insert(PlaylistItem)
+            .from_select(
+                ["id", "playlist_id", "segment_id", "position", "crossfade_duration", "created_at"],
+                next_item
+            )
+            .returning(PlaylistItem.position)
+        ).scalar_one()
     
-    # Update playlist timestamp
-    playlist.updated_at = datetime.utcnow().isoformat()
+    # Update playlist timestamp in the same transaction
+    playlist.updated_at = now
     
     db.commit()
     
     return AddPlaylistItemResponse(
-        id=item.id,
-        position=item.position,
-        crossfade_duration=item.crossfade_duration,
-        segment_id=item.segment_id,
-        playlist_id=item.playlist_id
+        id=item_id,
+        position=position,
+        crossfade_duration=request.crossfade_duration,
+        segment_id=request.segment_id,
+        playlist_id=playlist_id
     )
 
 
@@ -629,59 +788,89 @@ async def delete_playlist(playlist_id: str, db: Session = Depends(get_db)):
 
 # ============== Analysis ==============
 
-def analyze_song_and_save(song: Song, db: Session) -> dict:
+_analysis_pool: Optional[ProcessPoolExecutor] = None
+_analysis_pool_lock = threading.Lock()
+
+
+def _init_analysis_worker(db_path):
+    """Open the database in an analysis worker so it can use the analysis cache."""
+    from models import database
+    # Spawned workers (Windows/macOS) start without the parent's database;
+    # forked ones inherit it
+    if database.db is None:
+        database.init_database(db_path)
+
+
+def get_analysis_pool() -> ProcessPoolExecutor:
+    """Shared process pool for CPU-bound audio analysis, created on first use."""
+    global _analysis_pool
+    with _analysis_pool_lock:
+        if _analysis_pool is None:
+            _analysis_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                initializer=_init_analysis_worker,
+                initargs=(settings.database_path,),
+            )
+        return _analysis_pool
+
+
+def shutdown_analysis_pool():
+    """Stop the analysis worker processes (called on app shutdown)."""
+    global _analysis_pool
+    with _analysis_pool_lock:
+        if _analysis_pool is not None:
+            _analysis_pool.shutdown(wait=False, cancel_futures=True)
+            _analysis_pool = None
+
+
+async def analyze_song_and_save(song: Song, db: Session) -> dict:
     """Download audio, analyze, and save segments for a song."""
-    from datetime import datetime
-    import uuid
-    
     # Update status to analyzing
     song.analysis_status = "analyzing"
     db.commit()
     
     try:
-        # Step 1: Download audio
+        # Step 1: Download audio (blocking I/O, off the event loop)
         print(f"[{song.language}] Analyzing: {song.title}")
-        download_result = download_audio(song.youtube_url, song.id)
+        download_result = await run_in_threadpool(download_audio, song.youtube_url, song.id)
         
         if not download_result.success:
             song.analysis_status = "failed"
             db.commit()
             return {"error": download_result.error}
         
-        # Step 2: Analyze audio
-        analysis = analyze_audio_file(download_result.audio_path)
+        # Step 2: Analyze audio (CPU-bound, in a worker process)
+        analysis = await asyncio.get_running_loop().run_in_executor(
+            get_analysis_pool(), analyze_audio_file, download_result.audio_path
+        )
+        
+        return save_song_analysis(song, db, download_result.audio_path, analysis)
         
-        # Step 3: Update song with analysis results
+    except Exception as e:
+        song.analysis_status = "failed"
+        db.commit()
+        return {"error": str(e)}
+
+
+def save_song_analysis(song: Song, db: Session, audio_path: str, analysis) -> dict:
+    """Store analysis results on a song and replace its segments."""
+    try:
+        # Update song with analysis results
         song.bpm = analysis.bpm
         song.energy_score = analysis.overall_energy
-        song.cached_audio_path = download_result.audio_path
+        song.cached_audio_path = audio_path
         song.analysis_status = "complete"
-        song.updated_at = datetime.utcnow().isoformat()
         
-        # Step 4: Delete existing segments and save new ones
+        # Delete existing segments and save new ones
         db.query(Segment).filter(Segment.song_id == song.id).delete()
         
-        segments_created = []
-        for seg in analysis.segments:
-            segment = Segment(
-                id=str(uuid.uuid4()),
-                song_id=song.id,
-                start_time=seg.start_time,
-                end_time=seg.end_time,
-                duration=seg.duration,
-                energy_score=seg.energy_score,
-                is_primary=seg.is_primary,
-                label=seg.label
-            )
-            db.add(segment)
-            segments_created.append({
-                "id": segment.id,
-                "start_time": seg.start_time,
-                "end_time": seg.end_time,
-                "duration": seg.duration,
-                "energy_score": seg.energy_score,
-                "is_primary": seg.is_primary
-            })
+        rows = segments_to_insert_rows(song.id, analysis.segments)
+        if rows:
+            db.execute(insert(Segment), rows)
+        segments_created = [
+            {key: row[key] for key in ("id", "start_time", "end_time", "duration", "energy_score", "is_primary")}
+            for row in rows
+        ]
         
         db.commit()
         
@@ -705,7 +894,7 @@ async def analyze_song(song_id: str, db: Session = Depends(get_db)):
     if not song:
         raise HTTPException(status_code=404, detail={"error": "SONG_NOT_FOUND", "message": f"Song with ID '{song_id}' not found"})
     
-    result = analyze_song_and_save(song, db)
+    result = await analyze_song_and_save(song, db)
     
     if "error" in result:
         raise HTTPException(status_code=500, detail={"error": "ANALYSIS_FAILED", "message": result["error"]})
@@ -719,6 +908,56 @@ async def analyze_song(song_id: str, db: Session = Depends(get_db)):
     )
 
 
+def analyze_songs_parallel(songs: List[tuple]) -> Dict[str, dict]:
+    """
+    Download and analyze songs concurrently.
+    
+    Downloads run in a thread pool and each finished download is handed straight
+    to a process pool for analysis, so network I/O overlaps with CPU-bound work.
+    
+    Args:
+        songs: (song_id, youtube_url, language, title) tuples
+    
+    Returns:
+        Dict of song_id -> {"audio_path", "analysis"} or {"error"}
+    """
+    outcomes = {}
+    if not songs:
+        return outcomes
+    
+    analysis_pool = get_analysis_pool()
+    with ThreadPoolExecutor(max_workers=ANALYSIS_DOWNLOAD_WORKERS) as download_pool:
+        downloads = {
+            download_pool.submit(download_audio, youtube_url, song_id): (song_id, language, title)
+            for song_id, youtube_url, language, title in songs
+        }
+        analyses = {}
+        
+        for future in as_completed(downloads):
+            song_id, language, title = downloads[future]
+            try:
+                download_result = future.result()
+            except Exception as e:
+                outcomes[song_id] = {"error": str(e)}
+                continue
+            if not download_result.success:
+                outcomes[song_id] = {"error": download_result.error}
+                continue
+            
+            print(f"[{language}] Analyzing: {title}")
+            analysis_future = analysis_pool.submit(analyze_audio_file, download_result.audio_path)
+            analyses[analysis_future] = (song_id, download_result.audio_path)
+        
+        for future in as_completed(analyses):
+            song_id, audio_path = analyses[future]
+            try:
+                outcomes[song_id] = {"audio_path": audio_path, "analysis": future.result()}
+            except Exception as e:
+                outcomes[song_id] = {"error": str(e)}
+    
+    return outcomes
+
+
 @router.post("/analyze-all", response_model=AnalyzeAllResponse)
 async def analyze_all_songs(
     language: str = None,
@@ -735,8 +974,7 @@ async def analyze_all_songs(
     query = db.query(Song)
     
     if language:
-        if language not in SUPPORTED_LANGUAGES:
-            raise HTTPException(status_code=400, detail={"error": "INVALID_LANGUAGE", "message": f"Unsupported language: {language}"})
+        validate_languages([language])
         query = query.filter(Song.language == language)
     
     if not force:
@@ -752,7 +990,23 @@ async def analyze_all_songs(
     }
     
     for song in songs:
-        result = analyze_song_and_save(song, db)
+        song.analysis_status = "analyzing"
+    db.commit()
+    
+    # Download and analyze off the event loop; sessions stay on this thread
+    outcomes = await run_in_threadpool(
+        analyze_songs_parallel,
+        [(song.id, song.youtube_url, song.language, song.title) for song in songs]
+    )
+    
+    for song in songs:
+        outcome = outcomes[song.id]
+        if "error" in outcome:
+            song.analysis_status = "failed"
+            db.commit()
+            result = outcome
+        else:
+            result = save_song_analysis(song, db, outcome["audio_path"], outcome["analysis"])
         
         if "error" in result:
             results["failed"] += 1
@@ -790,8 +1044,136 @@ async def cache_stats():
 
 # ============== Export ==============
 
+# Finished export jobs kept in memory: the newest EXPORT_JOB_LIMIT, and none
+# older than EXPORT_JOB_TTL seconds. Running jobs are never evicted.
+EXPORT_JOB_LIMIT = 128
+EXPORT_JOB_TTL = 60 * 60
+
+
+class ExportJobStore(OrderedDict):
+    """Export jobs by ID, oldest update first, evicting finished jobs."""
+    
+    def __init__(self):
+        super().__init__()
+        # Reentrant so merge() can hold it across its own __setitem__
+        self._lock = threading.RLock()
+        self._finished_at: Dict[str, float] = {}
+    
+    def __setitem__(self, job_id, job):
+        with self._lock:
+            is_new = job_id not in self
+            super().__setitem__(job_id, job)
+            self.move_to_end(job_id)
+            if job.get("status") in _TERMINAL_STATUSES:
+                self._finished_at.setdefault(job_id, time.monotonic())
+            else:
+                self._finished_at.pop(job_id, None)
+            if is_new or job_id in self._finished_at:
+                self._evict()
+    
+    def update(self, *args, **kwargs):
+        for job_id, job in dict(*args, **kwargs).items():
+            self[job_id] = job
+    
+    def merge(self, job_id, fields) -> dict:
+        """Atomically replace a job with a copy that has fields applied."""
+        with self._lock:
+            job = {**self[job_id], **fields}
+            self[job_id] = job
+            return job
+    
+    def _evict(self):
+        now = time.monotonic()
+        for job_id in list(self._finished_at):
+            if len(self) > EXPORT_JOB_LIMIT or now - self._finished_at[job_id] > EXPORT_JOB_TTL:
+                self._finished_at.pop(job_id)
+                super().pop(job_id, None)
+
+
 # Store for export jobs (in production, use Redis or database)
-export_jobs = {}
+export_jobs = ExportJobStore()
+
+# Wakes the WebSocket broadcaster of a job when it changes: (loop, event)
+_export_job_wakeups: Dict[str, tuple] = {}
+
+# Broadcasters also wake on this interval to notice departed subscribers
+EXPORT_PROGRESS_IDLE_TIMEOUT = 5.0
+
+
+def notify_export_job(job_id: str):
+    """Wake the job's progress broadcaster, from any thread."""
+    wakeup = _export_job_wakeups.get(job_id)
+    if wakeup is not None:
+        loop, event = wakeup
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            # Loop already closed during shutdown
+            pass
+
+
+def update_export_job(job_id: str, fields: dict) -> dict:
+    """
+    Publish new fields for an export job by swapping in a fresh dict.
+    
+    Job dicts are never mutated in place, so status polls, WebSocket frames
+    and checkpoints on other threads always read a complete snapshot.
+    """
+    job = export_jobs.merge(job_id, fields)
+    notify_export_job(job_id)
+    return job
+
+# Extracts the 11-character video ID from watch and youtu.be URLs
+YOUTUBE_ID_PATTERN = re.compile(r'(?:v=|youtu\.be/)([a-zA-Z0-9_-]{11})')
+
+# Exports are ffmpeg-heavy; at most max_concurrent_exports run at once and
+# the rest wait in the pool queue with status "pending"
+_export_pool: Optional[ThreadPoolExecutor] = None
+_export_pool_lock = threading.Lock()
+
+
+def get_export_pool() -> ThreadPoolExecutor:
+    """Shared bounded pool that runs export jobs, created on first use."""
+    global _export_pool
+    with _export_pool_lock:
+        if _export_pool is None:
+            _export_pool = ThreadPoolExecutor(
+                max_workers=settings.max_concurrent_exports,
+                thread_name_prefix="export"
+            )
+        return _export_pool
+
+
+def submit_export(job_id: str, run) -> None:
+    """Queue an export job; a crash that escapes run() still fails the job."""
+    def report_crash(future):
+        if future.cancelled() or future.exception() is None:
+            return
+        import traceback
+        error = future.exception()
+        traceback.print_exception(type(error), error, error.__traceback__)
+        export_cancel_events.pop(job_id, None)
+        job = update_export_job(job_id, {
+            "status": "failed",
+            "current_step": f"Error: {error}",
+            "error": str(error)
+        })
+        checkpoint_job(job_id, job, force=True)
+    
+    get_export_pool().submit(run).add_done_callback(report_crash)
+
+
+def shutdown_export_pool():
+    """Drop queued exports (called on app shutdown)."""
+    global _export_pool
+    with _export_pool_lock:
+        if _export_pool is not None:
+            _export_pool.shutdown(wait=False, cancel_futures=True)
+            _export_pool = None
+
+# Cancel signal per export job. Kept out of export_jobs so job dicts stay
+# JSON-serializable; the worker threads check these between steps.
+export_cancel_events: Dict[str, threading.Event] = {}
 
 
 @router.post("/playlists/{playlist_id}/dj-context")
@@ -804,18 +1186,29 @@ async def set_dj_context(playlist_id: str, request: DJContextRequest, db: Sessio
     if not playlist:
         raise HTTPException(status_code=404, detail={"error": "PLAYLIST_NOT_FOUND"})
     
-    dj_contexts[playlist_id] = {
+    now = datetime.utcnow().isoformat()
+    context = {
         "theme": request.theme,
         "mood": request.mood,
         "audience": request.audience,
         "special_notes": request.special_notes or "",
         "custom_shoutouts": request.custom_shoutouts or [],
-        "updated_at": datetime.utcnow().isoformat()
+        "updated_at": now
     }
     
+    # Upsert: one context row per playlist
+    stmt = sqlite_insert(PlaylistDJContext).values(
+        playlist_id=playlist_id, context=json_dumps(context), updated_at=now
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["playlist_id"],
+        set_={"context": stmt.excluded.context, "updated_at": stmt.excluded.updated_at}
+    ))
+    db.commit()
+    
     return {
         "playlist_id": playlist_id,
-        "dj_context": dj_contexts[playlist_id],
+        "dj_context": context,
         "message": "DJ context saved successfully"
     }
 
@@ -827,13 +1220,7 @@ async def get_dj_context(playlist_id: str, db: Session = Depends(get_db)):
     if not playlist:
         raise HTTPException(status_code=404, detail={"error": "PLAYLIST_NOT_FOUND"})
     
-    context = dj_contexts.get(playlist_id, {
-        "theme": "New Year 2025 Party - Welcoming 2026!",
-        "mood": "energetic, celebratory, festive",
-        "audience": "party guests ready to dance",
-        "special_notes": "",
-        "custom_shoutouts": ["Happy New Year!", "2026 here we come!"]
-    })
+    context = load_dj_context(playlist_id, db)
     
     return {
         "playlist_id": playlist_id,
@@ -844,7 +1231,6 @@ async def get_dj_context(playlist_id: str, db: Session = Depends(get_db)):
 @router.post("/playlists/{playlist_id}/export")
 async def export_playlist(
     playlist_id: str,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     crossfade_duration: float = 1.5,
     transition_type: str = "random",
@@ -874,9 +1260,14 @@ async def export_playlist(
     if not playlist:
         raise HTTPException(status_code=404, detail={"error": "PLAYLIST_NOT_FOUND"})
     
-    items = db.query(PlaylistItem).filter(
-        PlaylistItem.playlist_id == playlist_id
-    ).order_by(PlaylistItem.position).all()
+    # Snapshot items with their segment and song in a single joined query
+    items = (
+        db.query(PlaylistItem)
+        .options(joinedload(PlaylistItem.segment).joinedload(Segment.song), raiseload("*"))
+        .filter(PlaylistItem.playlist_id == playlist_id)
+        .order_by(PlaylistItem.position)
+        .all()
+    )
     
     if not items:
         raise HTTPException(status_code=400, detail={"error": "EMPTY_PLAYLIST", "message": "Playlist has no items"})
@@ -884,18 +1275,17 @@ async def export_playlist(
     # Build export segments list
     export_segments = []
     for item in items:
-        segment = db.query(Segment).filter(Segment.id == item.segment_id).first()
+        segment = item.segment
         if not segment:
             continue
-        song = db.query(Song).filter(Song.id == segment.song_id).first()
+        song = segment.song
         if not song:
             continue
         
         # Extract youtube_id from youtube_url
-        import re
         youtube_id = None
         if song.youtube_url:
-            match = re.search(r'(?:v=|youtu\.be/)([a-zA-Z0-9_-]{11})', song.youtube_url)
+            match = YOUTUBE_ID_PATTERN.search(song.youtube_url)
             if match:
                 youtube_id = match.group(1)
         
@@ -918,18 +1308,23 @@ async def export_playlist(
         raise HTTPException(status_code=400, detail={"error": "NO_VALID_SEGMENTS"})
     
     # Create job
-    job_id = str(uuid.uuid4())
+    job_id = uuid.uuid4().hex
     export_jobs[job_id] = {
         "status": "pending",
         "progress": 0,
-        "current_step": "Starting...",
+        "current_step": "Queued...",
         "segment_index": 0,
         "total_segments": len(export_segments),
         "result": None
     }
+    cancel_event = export_cancel_events[job_id] = threading.Event()
+    notify_export_job(job_id)
+    await run_in_threadpool(checkpoint_job, job_id, export_jobs[job_id], force=True)
     
     def progress_callback(progress: ExportProgress):
-        export_jobs[job_id].update({
+        if cancel_event.is_set():
+            return
+        update_export_job(job_id, {
             "status": progress.status,
             "progress": progress.progress,
             "current_step": progress.current_step,
@@ -937,18 +1332,17 @@ async def export_playlist(
             "total_segments": progress.total_segments,
             "error": progress.error
         })
+        checkpoint_job(job_id, export_jobs[job_id])
+    
+    # Get DJ context for this playlist (if available)
+    playlist_dj_context = load_dj_context(playlist_id, db)
     
     def run_export():
         try:
-            # Get DJ context for this playlist (if available)
-            playlist_dj_context = dj_contexts.get(playlist_id, {
-                "theme": "New Year 2025 Party - Welcoming 2026!",
-                "mood": "energetic, celebratory, festive",
-                "audience": "party guests ready to dance",
-                "special_notes": "",
-                "custom_shoutouts": ["Happy New Year!", "2026 here we come!"]
-            })
-            
+            if cancel_event.is_set():
+                # Cancelled while still queued
+                return
+            update_export_job(job_id, {"current_step": "Starting..."})
             result = do_export(
                 segments=export_segments,
                 output_name=f"playlist_{playlist_id}_{job_id[:8]}",
@@ -960,25 +1354,32 @@ async def export_playlist(
                 dj_voice=dj_voice,
                 dj_frequency=dj_frequency,
                 dj_context=playlist_dj_context,  # Pass DJ context for creative commentary
-                progress_callback=progress_callback
+                progress_callback=progress_callback,
+                cancel_event=cancel_event
             )
-            export_jobs[job_id]["result"] = {
-                "success": result.success,
-                "output_path": result.output_path,
-                "duration_seconds": result.duration_seconds,
-                "file_size_bytes": result.file_size_bytes,
-                "error": result.error
+            if cancel_event.is_set():
+                update_export_job(job_id, {"status": "cancelled"})
+                return
+            fields = {
+                "result": {
+                    "success": result.success,
+                    "output_path": result.output_path,
+                    "duration_seconds": result.duration_seconds,
+                    "file_size_bytes": result.file_size_bytes,
+                    "error": result.error
+                },
+                "status": "complete" if result.success else "failed"
             }
-            if result.success:
-                export_jobs[job_id]["status"] = "complete"
-            else:
-                export_jobs[job_id]["status"] = "failed"
-                export_jobs[job_id]["error"] = result.error
+            if not result.success:
+                fields["error"] = result.error
+            update_export_job(job_id, fields)
         except Exception as e:
-            export_jobs[job_id]["status"] = "failed"
-            export_jobs[job_id]["error"] = str(e)
+            update_export_job(job_id, {"status": "failed", "error": str(e)})
+        finally:
+            export_cancel_events.pop(job_id, None)
+            checkpoint_job(job_id, export_jobs[job_id], force=True)
     
-    background_tasks.add_task(run_export)
+    submit_export(job_id, run_export)
     
     return {
         "job_id": job_id,
@@ -996,18 +1397,29 @@ async def export_playlist(
     }
 
 
+EXPORT_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+async def find_export_job(job_id: str) -> Optional[dict]:
+    """Look up an export job in this process, then in the shared job store."""
+    job = export_jobs.get(job_id)
+    if job is None:
+        job = await run_in_threadpool(get_job, job_id)
+    return job
+
+
 @router.get("/export/jobs/{job_id}")
 @router.get("/export/{job_id}")  # Alias for frontend compatibility
 async def get_export_status(job_id: str):
     """Get the status of an export job."""
-    from fastapi.responses import JSONResponse
-    
-    if job_id not in export_jobs:
+    job = await find_export_job(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail={"error": "JOB_NOT_FOUND"})
     
     # Return with cache-busting headers to ensure fresh progress updates
-    return JSONResponse(
-        content=export_jobs[job_id],
+    return Response(
+        content=json_dumps(job),
+        media_type="application/json",
         headers={
             "Cache-Control": "no-cache, no-store, must-revalidate",
             "Pragma": "no-cache",
@@ -1023,10 +1435,10 @@ async def download_export(job_id: str):
     from starlette.responses import Response
     import time
     
-    if job_id not in export_jobs:
+    job = await find_export_job(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail={"error": "JOB_NOT_FOUND"})
     
-    job = export_jobs[job_id]
     if job["status"] != "complete":
         raise HTTPException(status_code=400, detail={"error": "EXPORT_NOT_READY"})
     
@@ -1034,9 +1446,10 @@ async def download_export(job_id: str):
     if not result or not result.get("output_path"):
         raise HTTPException(status_code=500, detail={"error": "NO_OUTPUT_FILE"})
     
-    from pathlib import Path
-    output_path = Path(result["output_path"])
-    if not output_path.exists():
+    # One stat serves both the existence check and FileResponse's headers
+    try:
+        stat_result = await run_in_threadpool(os.stat, result["output_path"])
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail={"error": "FILE_NOT_FOUND"})
     
     # Generate unique download filename with timestamp to prevent browser caching
@@ -1045,9 +1458,10 @@ async def download_export(job_id: str):
     
     # Return file with cache-busting headers
     response = FileResponse(
-        path=str(output_path),
+        path=result["output_path"],
         media_type="video/mp4",
         filename=download_filename,
+        stat_result=stat_result,
         headers={
             "Cache-Control": "no-cache, no-store, must-revalidate",
             "Pragma": "no-cache",
@@ -1056,6 +1470,8 @@ async def download_export(job_id: str):
             "X-Content-Type-Options": "nosniff"
         }
     )
+    # Exports run to gigabytes; read in larger chunks than the 64KB default
+    response.chunk_size = EXPORT_DOWNLOAD_CHUNK_SIZE
     return response
 
 
@@ -1067,7 +1483,7 @@ async def intelligent_mix_playlist(
     db: Session = Depends(get_db),
     strategy: str = "balanced",
     energy_curve: str = "peak_middle",
-    max_same_language: int = 2
+    max_same_language: int = Query(2, ge=1, le=10)
 ):
     """
     Apply intelligent mixing to optimize playlist order.
@@ -1090,9 +1506,13 @@ async def intelligent_mix_playlist(
     if not playlist:
         raise HTTPException(status_code=404, detail={"error": "PLAYLIST_NOT_FOUND"})
     
-    items = db.query(PlaylistItem).filter(
-        PlaylistItem.playlist_id == playlist_id
-    ).order_by(PlaylistItem.position).all()
+    items = (
+        db.query(PlaylistItem)
+        .options(joinedload(PlaylistItem.segment).joinedload(Segment.song), raiseload("*"))
+        .filter(PlaylistItem.playlist_id == playlist_id)
+        .order_by(PlaylistItem.position)
+        .all()
+    )
     
     if not items:
         raise HTTPException(status_code=400, detail={"error": "EMPTY_PLAYLIST"})
@@ -1100,10 +1520,10 @@ async def intelligent_mix_playlist(
     # Build mixable segments
     mixable_segments = []
     for item in items:
-        segment = db.query(Segment).filter(Segment.id == item.segment_id).first()
+        segment = item.segment
         if not segment:
             continue
-        song = db.query(Song).filter(Song.id == segment.song_id).first()
+        song = segment.song
         if not song:
             continue
         
@@ -1130,13 +1550,23 @@ async def intelligent_mix_playlist(
         max_same_language=max_same_language
     )
     
-    # Update playlist item positions based on new order
+    # Map the new order back to playlist items (a segment can appear twice)
+    items_by_segment = defaultdict(deque)
+    for item in items:
+        items_by_segment[item.segment_id].append(item.id)
+    new_positions = {}
     for new_position, mixed_segment in enumerate(result.segments):
-        # Find the playlist item with this segment
-        for item in items:
-            if item.segment_id == mixed_segment.id:
-                item.position = new_position
-                break
+        if items_by_segment[mixed_segment.id]:
+            new_positions[items_by_segment[mixed_segment.id].popleft()] = new_position
+    
+    # Update playlist item positions with one UPDATE ... CASE per chunk
+    for item_ids in chunked(new_positions, CASE_UPDATE_CHUNK_SIZE):
+        db.execute(
+            update(PlaylistItem)
+            .where(PlaylistItem.id.in_(item_ids))
+            .values(position=case({item_id: new_positions[item_id] for item_id in item_ids}, value=PlaylistItem.id))
+            .execution_options(synchronize_session=False)
+        )
     
     playlist.updated_at = datetime.utcnow().isoformat()
     db.commit()
@@ -1162,31 +1592,67 @@ async def intelligent_mix_playlist(
     }
 
 
+# Suggestions per playlist and limit, keyed on the library and playlist
+# versions so any committed edit invalidates them (LRU)
+SUGGESTION_CACHE_SIZE = 128
+SUGGESTION_MAX_LIMIT = 50
+_suggestion_cache: "OrderedDict[tuple, dict]" = OrderedDict()
+
+
 @router.get("/playlists/{playlist_id}/suggest-next")
 async def suggest_next_segment(
     playlist_id: str,
     db: Session = Depends(get_db),
-    limit: int = 5
+    limit: int = Query(5, ge=1, le=SUGGESTION_MAX_LIMIT)
 ):
     """
     Suggest the best next segments to add to a playlist based on the last segment.
     """
+    cache_key = (playlist_id, limit, get_library_version(), get_playlist_version())
+    cached = _suggestion_cache.get(cache_key)
+    if cached is not None:
+        _suggestion_cache.move_to_end(cache_key)
+        return cached
+    
+    suggestions = build_suggestions(playlist_id, db, limit)
+    
+    _suggestion_cache[cache_key] = suggestions
+    while len(_suggestion_cache) > SUGGESTION_CACHE_SIZE:
+        _suggestion_cache.popitem(last=False)
+    
+    return suggestions
+
+
+def build_suggestions(playlist_id: str, db: Session, limit: int) -> dict:
+    """Score every segment not yet in the playlist against its last segment."""
     from services.mixer import suggest_next_segment as do_suggest, MixableSegment
     
     playlist = db.query(Playlist).filter(Playlist.id == playlist_id).first()
     if not playlist:
         raise HTTPException(status_code=404, detail={"error": "PLAYLIST_NOT_FOUND"})
     
-    items = db.query(PlaylistItem).filter(
-        PlaylistItem.playlist_id == playlist_id
-    ).order_by(PlaylistItem.position.desc()).all()
+    # The last three segments with their songs, newest first
+    recent_rows = (
+        db.query(Segment, Song)
+        .join(PlaylistItem, PlaylistItem.segment_id == Segment.id)
+        .join(Song, Song.id == Segment.song_id)
+        .filter(PlaylistItem.playlist_id == playlist_id)
+        .order_by(PlaylistItem.position.desc())
+        .limit(3)
+        .all()
+    )
     
-    if not items:
-        # No items, return any segments sorted by energy
-        all_segments = db.query(Segment).all()
+    if not recent_rows:
+        # No items, return the highest-energy segments
+        top_rows = (
+            db.query(Segment, Song)
+            .outerjoin(Song, Song.id == Segment.song_id)
+            .order_by(Segment.energy_score.desc())
+            .limit(limit)
+            .all()
+        )
         suggestions = []
-        for seg in all_segments[:limit]:
-            song = db.query(Song).filter(Song.id == seg.song_id).first()
+        for seg, song in top_rows:
             suggestions.append({
                 "segment_id": seg.id,
                 "song_title": song.title if song else "Unknown",
@@ -1197,9 +1663,7 @@ async def suggest_next_segment(
         return {"suggestions": suggestions}
     
     # Get the last segment
-    last_item = items[0]
-    last_segment = db.query(Segment).filter(Segment.id == last_item.segment_id).first()
-    last_song = db.query(Song).filter(Song.id == last_segment.song_id).first()
+    last_segment, last_song = recent_rows[0]
     
     current = MixableSegment(
         id=last_segment.id,
@@ -1214,35 +1678,23 @@ async def suggest_next_segment(
     )
     
     # Get recent languages
-    recent_languages = []
-    for item in items[:3]:
-        seg = db.query(Segment).filter(Segment.id == item.segment_id).first()
-        if seg:
-            song = db.query(Song).filter(Song.id == seg.song_id).first()
-            if song:
-                recent_languages.append(song.language)
-    
-    # Get all segments not in playlist
-    existing_segment_ids = {item.segment_id for item in items}
-    available_segments = db.query(Segment).filter(
-        ~Segment.id.in_(existing_segment_ids)
+    recent_languages = [song.language for _, song in recent_rows]
+    
+    # Get all segments not in playlist (anti-join, only the columns we score on)
+    in_playlist = select(PlaylistItem.id).where(
+        PlaylistItem.playlist_id == playlist_id,
+        PlaylistItem.segment_id == Segment.id
+    ).exists()
+    available_rows = db.execute(
+        select(
+            Segment.id, Segment.song_id, Song.title.label("song_title"), Song.language, Song.bpm,
+            Segment.energy_score, Segment.start_time, Segment.end_time, Segment.duration
+        )
+        .join(Song, Song.id == Segment.song_id)
+        .where(~in_playlist)
     ).all()
     
-    candidates = []
-    for seg in available_segments:
-        song = db.query(Song).filter(Song.id == seg.song_id).first()
-        if song:
-            candidates.append(MixableSegment(
-                id=seg.id,
-                song_id=song.id,
-                song_title=song.title,
-                language=song.language,
-                bpm=song.bpm,
-                energy_score=seg.energy_score,
-                start_time=seg.start_time,
-                end_time=seg.end_time,
-                duration=seg.duration
-            ))
+    candidates = [MixableSegment(**row._mapping) for row in available_rows]
     
     # Get suggestions
     scored = do_suggest(current, candidates, recent_languages)
@@ -1274,7 +1726,7 @@ async def suggest_next_segment(
 class AIPlaylistRequest(BaseModel):
     """Request model for AI-powered playlist generation."""
     prompt: str  # Natural language description of desired playlist
-    target_duration_minutes: int = 30  # Target playlist duration
+    target_duration_minutes: int = Field(30, ge=1, le=180)  # Target playlist duration
     auto_download: bool = True  # Whether to download songs from YouTube
     auto_export: bool = True  # Whether to auto-export with AI DJ
     output_name: Optional[str] = None  # Custom output filename
@@ -1347,7 +1799,7 @@ async def generate_ai_playlist(
         
         # If auto_download is enabled, start the full generation in background
         if request.auto_download and songs_with_url:
-            job_id = str(uuid.uuid4())
+            job_id = uuid.uuid4().hex
             output_name = request.output_name or f"ai_mix_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             
             # Start background job
@@ -1470,12 +1922,11 @@ async def preview_ai_playlist(request: AIPlaylistRequest):
 
 from fastapi import WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
-import json
-import re
-import asyncio
 
-# Store for WebSocket connections per job
-websocket_connections: dict = {}
+# Live export progress subscribers per job. A single broadcaster task per job
+# encodes each update once and fans it out to every subscribed socket.
+job_subscribers: Dict[str, Set[WebSocket]] = defaultdict(set)
+_job_broadcasters: Dict[str, asyncio.Task] = {}
 
 
 class AIChatMessageRequest(BaseModel):
@@ -1490,17 +1941,92 @@ class AIApproveRequest(BaseModel):
     modifications: Optional[dict] = None
 
 
+# Streamed tokens are coalesced into one SSE frame per this many characters
+# or seconds, whichever comes first
+CHAT_FLUSH_CHARS = 512
+CHAT_FLUSH_INTERVAL = 0.02
+
+# SSE comment sent when the model has been silent this long, so proxies
+# and browsers don't drop the idle connection
+CHAT_KEEPALIVE_INTERVAL = 15.0
+SSE_KEEPALIVE = ": keepalive\n\n"
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+_ITERATION_DONE = object()
+
+
+async def iterate_in_thread(make_iterator, idle_timeout: Callable[[], float]):
+    """
+    Drive a blocking iterator in a worker thread and yield its items here.
+    
+    Yields None whenever nothing arrives for idle_timeout() seconds; it is
+    re-evaluated before every wait so the caller can shorten it while it
+    holds buffered output. Closing the generator early stops the worker at
+    its next item.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stopped = threading.Event()
+    
+    def pump():
+        try:
+            for item in make_iterator():
+                if stopped.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, (item, None))
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, (_ITERATION_DONE, e))
+        else:
+            loop.call_soon_threadsafe(queue.put_nowait, (_ITERATION_DONE, None))
+    
+    loop.run_in_executor(None, pump)
+    try:
+        while True:
+            try:
+                item, error = await asyncio.wait_for(queue.get(), idle_timeout())
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if item is _ITERATION_DONE:
+                if error is not None:
+                    raise error
+                break
+            yield item
+    finally:
+        stopped.set()
+
+
+def sse_content_frame(content: str) -> str:
+    """SSE frame carrying a piece of the assistant's reply."""
+    return f"data: {json_dumps({'type': 'content', 'content': content})}\n\n"
+
+
+# Finished plan block the AI DJ emits once the user has confirmed
+PLAN_JSON_PATTERN = re.compile(r'```json\s*(\{.*?"ready":\s*true.*?\})\s*```', re.DOTALL)
+# Replies longer than this are not scanned for a plan
+PLAN_SCAN_MAX_CHARS = 200_000
+
+
+def find_plan_json(text: str) -> Optional[str]:
+    """Return the JSON of a finished plan in an AI reply, if it has one."""
+    # Cheap substring checks first: most replies are plain conversation
+    if len(text) > PLAN_SCAN_MAX_CHARS or "```json" not in text or '"ready"' not in text:
+        return None
+    match = PLAN_JSON_PATTERN.search(text)
+    return match.group(1) if match else None
+
+
 @router.post("/ai-chat/start")
 async def start_ai_chat(db: Session = Depends(get_db)):
     """Start a new AI DJ chat session."""
     from models.database import AIPlaylistPlan
-    session_id = str(uuid.uuid4())
+    session_id = uuid.uuid4().hex
     
     plan = AIPlaylistPlan(
-        id=str(uuid.uuid4()),
+        id=uuid.uuid4().hex,
         session_id=session_id,
         status="draft",
-        conversation_history="[]"
+        conversation_history=[]
     )
     db.add(plan)
     db.commit()
@@ -1509,32 +2035,35 @@ async def start_ai_chat(db: Session = Depends(get_db)):
 
 
 @router.post("/ai-chat/message")
-async def ai_chat_message(request: AIChatMessageRequest, db: Session = Depends(get_db)):
+async def ai_chat_message(request: AIChatMessageRequest):
     """Process a chat message and return streaming AI response."""
     from models.database import AIPlaylistPlan
     
     async def generate_response():
+        # The body streams after the request's dependencies have exited, so
+        # the generator owns its session rather than borrowing get_db's
+        db = new_session()
         try:
             from services.azure_dj_voice import AZURE_OPENAI_AVAILABLE
             
             # Get or create session
-            session_id = request.session_id or str(uuid.uuid4())
+            session_id = request.session_id or uuid.uuid4().hex
             plan = db.query(AIPlaylistPlan).filter(
                 AIPlaylistPlan.session_id == session_id
             ).first()
             
             if not plan:
                 plan = AIPlaylistPlan(
-                    id=str(uuid.uuid4()),
+                    id=uuid.uuid4().hex,
                     session_id=session_id,
                     status="draft",
-                    conversation_history="[]"
+                    conversation_history=[]
                 )
                 db.add(plan)
                 db.commit()
             
             # Parse conversation history
-            history = json.loads(plan.conversation_history or "[]")
+            history = list(plan.conversation_history or [])
             history.append({"role": "user", "content": request.message})
             
             # System prompt for DJ planning
@@ -1580,80 +2109,175 @@ Include ONLY the languages that appear in the songs. Be conversational, fun, and
                 except Exception as azure_err:
                     # Fallback when Azure OpenAI fails
                     fallback_msg = f"🎧 Hey DJ! Azure OpenAI isn't configured yet. Tell me about your party and I'll help plan it! What's the occasion, vibe, and music preferences?"
-                    yield f"data: {json.dumps({'type': 'content', 'content': fallback_msg})}\n\n"
-                    yield f"data: {json.dumps({'type': 'done', 'session_id': session_id})}\n\n"
+                    yield sse_content_frame(fallback_msg)
+                    yield f"data: {json_dumps({'type': 'done', 'session_id': session_id})}\n\n"
                     history.append({"role": "assistant", "content": fallback_msg})
-                    plan.conversation_history = json.dumps(history)
+                    plan.conversation_history = history
                     db.commit()
                     return
                 
                 messages = [{"role": "system", "content": system_prompt}]
                 messages.extend(history)
                 
-                stream = client.chat.completions.create(
-                    model=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o"),
-                    messages=messages,
-                    stream=True,
-                    max_tokens=1500,
-                    temperature=0.8
-                )
+                def stream_tokens():
+                    # Runs in a worker thread: the OpenAI client is blocking
+                    stream = client.chat.completions.create(
+                        model=os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o"),
+                        messages=messages,
+                        stream=True,
+                        max_tokens=1500,
+                        temperature=0.8
+                    )
+                    for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                
+                parts = []
+                pending = []
+                pending_chars = 0
+                last_flush = time.monotonic()
+                def idle_timeout():
+                    # Buffered text goes out within the flush interval even if
+                    # the model stalls; otherwise only keepalives are due
+                    return CHAT_FLUSH_INTERVAL if pending else CHAT_KEEPALIVE_INTERVAL
                 
-                full_response = ""
-                for chunk in stream:
-                    if chunk.choices and chunk.choices[0].delta.content:
-                        content = chunk.choices[0].delta.content
-                        full_response += content
-                        yield f"data: {json.dumps({'type': 'content', 'content': content})}\n\n"
+                async for content in iterate_in_thread(stream_tokens, idle_timeout):
+                    if content is None:
+                        # Model is silent: flush what we have, or keep the connection alive
+                        yield sse_content_frame("".join(pending)) if pending else SSE_KEEPALIVE
+                        pending.clear()
+                        pending_chars = 0
+                        last_flush = time.monotonic()
+                    else:
+                        parts.append(content)
+                        pending.append(content)
+                        pending_chars += len(content)
+                        now = time.monotonic()
+                        if pending_chars >= CHAT_FLUSH_CHARS or now - last_flush >= CHAT_FLUSH_INTERVAL:
+                            yield sse_content_frame("".join(pending))
+                            pending.clear()
+                            pending_chars = 0
+                            last_flush = now
+                if pending:
+                    yield sse_content_frame("".join(pending))
+                full_response = "".join(parts)
                 
                 # Check if response contains a plan
-                plan_match = re.search(r'```json\s*(\{.*?"ready":\s*true.*?\})\s*```', 
-                                      full_response, re.DOTALL)
-                if plan_match:
+                plan_json = find_plan_json(full_response)
+                if plan_json:
                     try:
-                        plan_data = json.loads(plan_match.group(1))
+                        plan_data = json_loads(plan_json)
                         plan.theme = plan_data.get("theme")
-                        plan.mood = json.dumps(plan_data.get("mood", []))
-                        plan.songs = json.dumps(plan_data.get("songs", []))
-                        plan.commentary_samples = json.dumps(plan_data.get("commentary_samples", []))
+                        plan.mood = plan_data.get("mood", [])
+                        plan.songs = plan_data.get("songs", [])
+                        plan.commentary_samples = plan_data.get("commentary_samples", [])
                         
                         # Prioritize party_people (friend names) over shoutouts for DJ voice
                         party_people = plan_data.get("party_people", [])
                         if party_people:
                             # Use friend names for DJ shoutouts
-                            plan.shoutouts = json.dumps(party_people)
+                            plan.shoutouts = party_people
                         else:
-                            plan.shoutouts = json.dumps(plan_data.get("shoutouts", []))
+                            plan.shoutouts = plan_data.get("shoutouts", [])
                         
-                        plan.languages = json.dumps(plan_data.get("languages", []))
+                        plan.languages = plan_data.get("languages", [])
                         plan.duration_minutes = plan_data.get("duration_minutes", 30)
                         
-                        yield f"data: {json.dumps({'type': 'plan', 'plan': plan_data})}\n\n"
+                        yield f"data: {json_dumps({'type': 'plan', 'plan': plan_data})}\n\n"
                     except json.JSONDecodeError:
                         pass
                 
                 # Save conversation
                 history.append({"role": "assistant", "content": full_response})
-                plan.conversation_history = json.dumps(history)
+                plan.conversation_history = history
                 db.commit()
                 
-                yield f"data: {json.dumps({'type': 'done', 'session_id': session_id})}\n\n"
+                yield f"data: {json_dumps({'type': 'done', 'session_id': session_id})}\n\n"
                 
             else:
                 # Fallback without Azure OpenAI
                 fallback_msg = "Hey! I'd love to help you create an amazing playlist! Tell me about your party - what's the occasion, what languages/genres, and what vibe? 🎉"
-                yield f"data: {json.dumps({'type': 'content', 'content': fallback_msg})}\n\n"
-                yield f"data: {json.dumps({'type': 'done', 'session_id': session_id})}\n\n"
+                yield sse_content_frame(fallback_msg)
+                yield f"data: {json_dumps({'type': 'done', 'session_id': session_id})}\n\n"
                 
         except Exception as e:
             import traceback
             traceback.print_exc()
-            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+            yield f"data: {json_dumps({'type': 'error', 'error': str(e)})}\n\n"
+        finally:
+            db.close()
+    
+    return StreamingResponse(generate_response(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+# yt-dlp search clients, one per search thread: a YoutubeDL instance keeps
+# per-extraction state, so threads must not share one
+_search_ydl = threading.local()
+
+# How long a youtube_cookies.txt existence check stays valid
+COOKIES_CHECK_INTERVAL = 60.0
+_cookies_check = (float("-inf"), None)  # (monotonic time, cookies path or None)
+
+
+def get_youtube_cookiefile() -> Optional[str]:
+    """Path of the YouTube cookies file if present, re-checked once a minute."""
+    global _cookies_check
+    checked_at, cookiefile = _cookies_check
+    now = time.monotonic()
+    if now - checked_at >= COOKIES_CHECK_INTERVAL:
+        cookies_file = settings.cache_dir / "youtube_cookies.txt"
+        cookiefile = str(cookies_file) if cookies_file.exists() else None
+        _cookies_check = (now, cookiefile)
+    return cookiefile
+
+
+def get_search_ydl():
+    """Get this thread's flat-search YoutubeDL, created on first use."""
+    import yt_dlp
     
-    return StreamingResponse(generate_response(), media_type="text/event-stream")
+    cookiefile = get_youtube_cookiefile()
+    
+    # Rebuild if a cookies file appeared or went away since creation
+    if getattr(_search_ydl, "cookiefile", False) != cookiefile:
+        opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'extract_flat': True,
+            'default_search': 'ytsearch',
+        }
+        if cookiefile:
+            opts['cookiefile'] = cookiefile
+        _search_ydl.client = yt_dlp.YoutubeDL(opts)
+        _search_ydl.cookiefile = cookiefile
+    return _search_ydl.client
+
+
+# Fallbacks for fields an AI plan song may leave out
+PLAN_SONG_DEFAULTS = {
+    'title': 'Unknown',
+    'artist': 'Unknown Artist',
+    'language': 'English',
+    'era': 'recent',
+    'genre': 'pop',
+    'youtube_url': None,
+    'youtube_id': None,
+}
+
+
+def plan_song_to_recommendation(song_data: dict):
+    """Build a SongRecommendation from a song dict in an AI plan."""
+    from services.song_recommender import SongRecommendation
+    
+    fields = {key: song_data.get(key, default) for key, default in PLAN_SONG_DEFAULTS.items()}
+    return SongRecommendation(
+        **fields,
+        search_query=song_data.get('search_query', f"{song_data.get('artist', '')} {song_data.get('title', '')}"),
+        reason=song_data.get('reason', song_data.get('why', ''))
+    )
 
 
 @router.post("/ai-chat/approve")
-async def approve_ai_plan(request: AIApproveRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def approve_ai_plan(request: AIApproveRequest, db: Session = Depends(get_db)):
     """Approve the AI-generated plan and start generation."""
     from models.database import AIPlaylistPlan
     import time
@@ -1668,34 +2292,37 @@ async def approve_ai_plan(request: AIApproveRequest, background_tasks: Backgroun
     # Apply modifications
     if request.modifications:
         if "shoutouts" in request.modifications:
-            plan.shoutouts = json.dumps(request.modifications["shoutouts"])
+            plan.shoutouts = request.modifications["shoutouts"]
         if "songs" in request.modifications:
-            plan.songs = json.dumps(request.modifications["songs"])
+            plan.songs = request.modifications["songs"]
     
     plan.status = "approved"
-    job_id = str(uuid.uuid4())
+    job_id = uuid.uuid4().hex
     plan.export_job_id = job_id
     db.commit()
     
     # Get songs from the plan
-    songs = json.loads(plan.songs) if plan.songs else []
+    songs = plan.songs or []
     total_songs = len(songs)
     
     # Get theme and shoutouts for DJ voice
     plan_theme = plan.theme or "Party Mix"
-    plan_shoutouts = json.loads(plan.shoutouts) if plan.shoutouts else []
+    plan_shoutouts = plan.shoutouts or []
     plan_mood = plan.mood if hasattr(plan, 'mood') and plan.mood else "energetic, fun"
     
     # Initialize export job in the shared dict
     export_jobs[job_id] = {
         "status": "pending",
         "progress": 0,
-        "current_step": "Starting...",
+        "current_step": "Queued...",
         "segment_index": 0,
         "total_segments": total_songs,
         "result": None,
         "output_path": None
     }
+    cancel_event = export_cancel_events[job_id] = threading.Event()
+    notify_export_job(job_id)
+    await run_in_threadpool(checkpoint_job, job_id, export_jobs[job_id], force=True)
     
     # Run real export pipeline in background
     def run_ai_export():
@@ -1705,22 +2332,28 @@ async def approve_ai_plan(request: AIApproveRequest, background_tasks: Backgroun
         2. Analyze for BPM/energy and find best segments (using YouTube heatmap + audio analysis)
         3. Export as a mixed video with crossfades
         """
-        from services.auto_playlist import AutoPlaylistGenerator, DownloadedSong
-        from services.song_recommender import SongRecommendation
-        from services.exporter import export_playlist
+        from services.auto_playlist import AutoPlaylistGenerator, DownloadedSong, analyze_downloaded_song
+        from services.exporter import export_playlist, ExportCancelled
         from pathlib import Path
         import os
         import sys
         
-        print(f"[AI_EXPORT] ========== Starting export for job {job_id} ==========", flush=True)
-        print(f"[AI_EXPORT] Songs to process: {len(songs)}", flush=True)
+        def check_cancelled():
+            if cancel_event.is_set():
+                raise ExportCancelled()
+        
+        export_log.info(f"========== Starting export for job {job_id} ==========")
+        export_log.info(f"Songs to process: {len(songs)}")
         for s in songs:
-            print(f"[AI_EXPORT]   - {s.get('artist', 'Unknown')} - {s.get('title', 'Unknown')}", flush=True)
+            export_log.info(f"  - {s.get('artist', 'Unknown')} - {s.get('title', 'Unknown')}")
         
         try:
+            check_cancelled()
+            update_export_job(job_id, {"current_step": "Starting..."})
+            
             # Create progress callback for the generator
             def update_progress(message: str, progress: float):
-                export_jobs[job_id].update({
+                update_export_job(job_id, {
                     "current_step": message,
                     "progress": int(progress * 100)
                 })
@@ -1733,166 +2366,231 @@ async def approve_ai_plan(request: AIApproveRequest, background_tasks: Backgroun
             
             # Phase 0: Search YouTube for URLs (songs from AI chat may not have URLs)
             # Use yt-dlp directly to avoid SongRecommender's Azure OpenAI initialization
-            import yt_dlp
             import sys
             from pathlib import Path
             
             def search_youtube_direct(query: str) -> dict:
                 """Search YouTube directly with yt-dlp, no Azure OpenAI needed"""
-                # Check for cookies file
-                cookies_file = settings.cache_dir / "youtube_cookies.txt"
-                
-                ydl_opts_base = {
-                    'quiet': True,
-                    'no_warnings': True,
-                    'extract_flat': True,
-                    'default_search': 'ytsearch',
-                }
-                
-                # Add cookies if available
-                if cookies_file.exists():
-                    ydl_opts_base['cookiefile'] = str(cookies_file)
+                cached = get_cached_search(query)
+                if cached:
+                    return cached
                 
                 try:
-                    with yt_dlp.YoutubeDL(ydl_opts_base) as ydl:
-                        result = ydl.extract_info(f"ytsearch1:{query}", download=False)
-                        if result and 'entries' in result and result['entries']:
-                            video = result['entries'][0]
-                            return {
-                                'id': video.get('id'),
-                                'title': video.get('title'),
-                                'url': f"https://www.youtube.com/watch?v={video.get('id')}",
-                                'duration': video.get('duration', 0),
-                            }
+                    result = get_search_ydl().extract_info(f"ytsearch1:{query}", download=False)
+                    if result and 'entries' in result and result['entries']:
+                        video = result['entries'][0]
+                        found = {
+                            'id': video.get('id'),
+                            'title': video.get('title'),
+                            'url': f"https://www.youtube.com/watch?v={video.get('id')}",
+                            'duration': video.get('duration', 0),
+                        }
+                        if found['id']:
+                            cache_search(query, found)
+                        return found
                 except Exception as e:
-                    print(f"[AI_EXPORT] YouTube search failed: {e}", flush=True)
+                    export_log.warning(f"YouTube search failed: {e}")
                 return None
             
-            songs_with_urls = []
-            for i, song_data in enumerate(songs):
-                export_jobs[job_id].update({
-                    "status": "searching",
-                    "current_step": f"🔍 Finding on YouTube ({i+1}/{total_songs}): {song_data.get('title', 'Unknown')}",
-                    "progress": int((i / total_songs) * 10),  # Search = 0-10%
-                    "segment_index": i + 1
-                })
-                print(f"[AI_EXPORT] Searching for: {song_data.get('title', 'Unknown')}", flush=True)
+            # Search for every song without a URL at once; each search is a network round-trip
+            update_export_job(job_id, {
+                "status": "searching",
+                "current_step": f"🔍 Finding on YouTube (0/{total_songs})",
+                "progress": 0,  # Search = 0-10%
+                "segment_index": 0
+            })
+            checkpoint_job(job_id, export_jobs[job_id])
+            
+            search_pool = ThreadPoolExecutor(max_workers=YOUTUBE_SEARCH_WORKERS)
+            try:
+                # Group songs by normalized query so duplicates share one search
+                buckets = {}
+                for song_data in songs:
+                    if not song_data.get('youtube_url'):
+                        search_query = f"{song_data.get('artist', '')} {song_data.get('title', '')} official"
+                        buckets.setdefault(normalize_query(search_query), (search_query, []))[1].append(song_data)
                 
-                # If no youtube_url, search for it
-                if not song_data.get('youtube_url'):
-                    search_query = f"{song_data.get('artist', '')} {song_data.get('title', '')} official"
-                    result = search_youtube_direct(search_query)
-                    if result:
-                        song_data['youtube_url'] = result['url']
-                        song_data['youtube_id'] = result['id']
-                        print(f"[AI_EXPORT] [OK] Found: {song_data.get('title')} -> {result['url']}", flush=True)
-                    else:
-                        print(f"[AI_EXPORT] [FAIL] Not found on YouTube: {song_data.get('title')}", flush=True)
+                searches = {}
+                for search_query, bucket in buckets.values():
+                    export_log.info(f"Searching for: {bucket[0].get('title', 'Unknown')}")
+                    searches[search_pool.submit(search_youtube_direct, search_query)] = bucket
                 
-                if song_data.get('youtube_url'):
-                    songs_with_urls.append(song_data)
+                pending_songs = sum(len(bucket) for bucket in searches.values())
+                if pending_songs > len(searches):
+                    export_log.info(f"{pending_songs} songs need {len(searches)} unique searches")
+                
+                searched = total_songs - pending_songs
+                for future in as_completed(searches):
+                    check_cancelled()
+                    bucket = searches[future]
+                    result = future.result()
+                    for song_data in bucket:
+                        if result:
+                            song_data['youtube_url'] = result['url']
+                            song_data['youtube_id'] = result['id']
+                            export_log.info(f"[OK] Found: {song_data.get('title')} -> {result['url']}")
+                        else:
+                            export_log.info(f"[FAIL] Not found on YouTube: {song_data.get('title')}")
+                    
+                    searched += len(bucket)
+                    update_export_job(job_id, {
+                        "current_step": f"🔍 Finding on YouTube ({searched}/{total_songs}): {bucket[0].get('title', 'Unknown')}",
+                        "progress": int((searched / total_songs) * 10),
+                        "segment_index": searched
+                    })
+                    checkpoint_job(job_id, export_jobs[job_id])
+            finally:
+                search_pool.shutdown(wait=False, cancel_futures=True)
+            
+            songs_with_urls = [song_data for song_data in songs if song_data.get('youtube_url')]
             
             if not songs_with_urls:
                 raise Exception("No songs found on YouTube")
             
-            # Phase 1: Download songs
+            # Phases 1-3: download, analyze and encode as a pipeline. Each song
+            # moves on as soon as its previous stage finishes, so ffmpeg works on
+            # early songs while later ones are still downloading. Encoding only
+            # needs a song's own segment, so the mix order is applied afterwards.
             import time
             phase_start = time.time()
             
-            export_jobs[job_id].update({
+            update_export_job(job_id, {
                 "status": "downloading",
                 "current_step": "⬇️ Starting downloads from YouTube...",
                 "progress": 10,
                 "phase_start": phase_start
             })
             
-            downloaded_songs = []
-            download_times = []  # Track per-song download time for ETA
+            # Convert plan dicts to SongRecommendations up front; the pipeline below only does I/O
+            song_recs = [plan_song_to_recommendation(song_data) for song_data in songs_with_urls]
+            total = len(song_recs)
             
-            for i, song_data in enumerate(songs_with_urls):
-                song_start = time.time()
-                
-                # Convert dict to SongRecommendation
-                song_rec = SongRecommendation(
-                    title=song_data.get('title', 'Unknown'),
-                    artist=song_data.get('artist', 'Unknown Artist'),
-                    language=song_data.get('language', 'English'),
-                    era=song_data.get('era', 'recent'),
-                    genre=song_data.get('genre', 'pop'),
-                    search_query=song_data.get('search_query', f"{song_data.get('artist', '')} {song_data.get('title', '')}"),
-                    youtube_url=song_data.get('youtube_url'),
-                    youtube_id=song_data.get('youtube_id'),
-                    reason=song_data.get('reason', song_data.get('why', ''))
+            # Generate output path - use absolute path from settings
+            # (created by settings.ensure_directories() at startup)
+            output_dir = settings.exports_dir
+            output_filename = f"ai_mix_{job_id[:8]}.mp4"
+            output_path = output_dir / output_filename
+            
+            # Use create_transition_concat for smooth crossfades and visible transitions
+            from services.exporter import create_transition_concat, extract_and_overlay_segment
+            
+            def download_one(index: int, song_rec):
+                return generator.download_song(song_rec, index + 1, total)
+            
+            def extract_one(index: int, song, intermediate: bool = len(song_recs) > 1, suffix: str = ""):
+                temp_path = output_dir / f"temp_seg_{job_id[:8]}_{index}{suffix}.mp4"
+                success = extract_and_overlay_segment(
+                    video_path=Path(song.video_path),
+                    output_path=temp_path,
+                    start_time=song.best_segment_start,
+                    end_time=song.best_segment_end,
+                    title=song.original.title,
+                    artist=song.original.artist,
+                    language=song.original.language,
+                    threads=SEGMENT_ENCODE_THREADS,
+                    cancel_event=cancel_event,
+                    intermediate=intermediate
                 )
-                
-                # Calculate ETA based on average download time
-                remaining = len(songs_with_urls) - i
-                avg_time = sum(download_times) / len(download_times) if download_times else 30  # Default 30s per song
-                eta_seconds = int(remaining * avg_time)
-                eta_str = f"~{eta_seconds//60}m {eta_seconds%60}s" if eta_seconds >= 60 else f"~{eta_seconds}s"
-                
-                export_jobs[job_id].update({
-                    "current_step": f"⬇️ Downloading ({i+1}/{len(songs_with_urls)}): {song_rec.title} [{eta_str} remaining]",
-                    "progress": 10 + int((i / len(songs_with_urls)) * 25),  # Downloads = 10-35%
-                    "segment_index": i + 1,
-                    "eta_seconds": eta_seconds
-                })
-                
-                downloaded = generator.download_song(song_rec, i + 1, len(songs_with_urls))
-                
-                # Record download time for ETA calculation
-                download_times.append(time.time() - song_start)
-                
-                if downloaded:
-                    downloaded_songs.append(downloaded)
-                    export_jobs[job_id].update({
-                        "current_step": f"✅ Downloaded ({i+1}/{len(songs_with_urls)}): {song_rec.title}",
+                if success and temp_path.exists():
+                    return temp_path
+                temp_path.unlink(missing_ok=True)
+                return None
+            
+            analyzed = {}  # plan index -> analyzed song
+            extracted = {}  # plan index -> encoded temp segment
+            downloads_done = downloads_ok = analyses_done = encodes_done = 0
+            download_pool = ThreadPoolExecutor(max_workers=YOUTUBE_DOWNLOAD_WORKERS)
+            encode_pool = ThreadPoolExecutor(
+                max_workers=max(1, min(total, (os.cpu_count() or 2) // SEGMENT_ENCODE_THREADS))
+            )
+            analysis_pool = get_analysis_pool()
+            stages = {
+                download_pool.submit(download_one, i, song_rec): ("download", i)
+                for i, song_rec in enumerate(song_recs)
+            }
+            try:
+                while stages:
+                    done, _ = wait(stages, timeout=0.5, return_when=FIRST_COMPLETED)
+                    check_cancelled()
+                    if not done:
+                        continue
+                    
+                    for future in done:
+                        stage, i = stages.pop(future)
+                        title = song_recs[i].title
+                        if stage == "download":
+                            downloads_done += 1
+                            song = future.result()
+                            if song:
+                                downloads_ok += 1
+                                stages[analysis_pool.submit(
+                                    analyze_downloaded_song, song,
+                                    str(generator.downloads_dir), str(generator.exports_dir)
+                                )] = ("analyze", i)
+                                step = f"✅ Downloaded: {title}"
+                            else:
+                                step = f"⚠️ Skipped: {title}"
+                        elif stage == "analyze":
+                            analyses_done += 1
+                            # Worker processes return analyzed copies
+                            analyzed[i] = future.result()
+                            stages[encode_pool.submit(extract_one, i, analyzed[i])] = ("encode", i)
+                            step = f"🎵 Analyzed: {title}"
+                        else:
+                            encodes_done += 1
+                            temp_path = future.result()
+                            if temp_path:
+                                extracted[i] = temp_path
+                                step = f"🎬 Processed: {title}"
+                            else:
+                                step = f"⚠️ Processing failed: {title}"
+                    
+                    # Every downloaded song still needs analysis and encoding
+                    expected = total + 2 * (downloads_ok + total - downloads_done)
+                    completed = downloads_done + analyses_done + encodes_done
+                    elapsed = time.time() - phase_start
+                    eta_seconds = int(elapsed * (expected - completed) / completed)
+                    eta_str = f"~{eta_seconds//60}m {eta_seconds%60}s" if eta_seconds >= 60 else f"~{eta_seconds}s"
+                    
+                    if downloads_done < total:
+                        status = "downloading"
+                    elif analyses_done < downloads_ok:
+                        status = "analyzing"
+                    else:
+                        status = "exporting"
+                    update_export_job(job_id, {
+                        "status": status,
+                        "current_step": f"{step} (⬇️ {downloads_done}/{total} · 🎵 {analyses_done} · 🎬 {encodes_done}) [{eta_str}]",
+                        "progress": 10 + int((completed / expected) * 75),  # Pipeline = 10-85%
+                        "segment_index": encodes_done,
+                        "eta_seconds": eta_seconds
                     })
+                    checkpoint_job(job_id, export_jobs[job_id])
+            except BaseException:
+                for future in stages:
+                    future.cancel()
+                download_pool.shutdown(wait=False, cancel_futures=True)
+                # Let running encodes finish so their temp files can be removed
+                encode_pool.shutdown(wait=True, cancel_futures=True)
+                for i in range(total):
+                    (output_dir / f"temp_seg_{job_id[:8]}_{i}.mp4").unlink(missing_ok=True)
+                raise
+            finally:
+                download_pool.shutdown(wait=False)
+                encode_pool.shutdown(wait=False)
             
-            if not downloaded_songs:
+            if not downloads_ok:
                 raise Exception("No songs could be downloaded")
             
-            # Phase 2: Analyze songs (uses YouTube heatmap + audio analysis)
-            analysis_times = []
-            export_jobs[job_id].update({
-                "status": "analyzing",
-                "current_step": "🎵 Analyzing songs for best segments...",
-                "progress": 35
-            })
-            
-            for i, song in enumerate(downloaded_songs):
-                analysis_start = time.time()
-                
-                # Calculate ETA
-                remaining = len(downloaded_songs) - i
-                avg_time = sum(analysis_times) / len(analysis_times) if analysis_times else 5  # Default 5s per song
-                eta_seconds = int(remaining * avg_time)
-                eta_str = f"~{eta_seconds}s" if eta_seconds < 60 else f"~{eta_seconds//60}m {eta_seconds%60}s"
-                
-                export_jobs[job_id].update({
-                    "current_step": f"🎵 Analyzing ({i+1}/{len(downloaded_songs)}): {song.original.title} [{eta_str}]",
-                    "progress": 35 + int((i / len(downloaded_songs)) * 15),  # Analysis = 35-50%
-                    "eta_seconds": eta_seconds
-                })
-                generator.analyze_song(song)
-                analysis_times.append(time.time() - analysis_start)
-            
-            # Phase 3: Create optimal mix order
-            export_jobs[job_id].update({
+            # Phase 4: Create optimal mix order from the analyzed songs
+            update_export_job(job_id, {
                 "status": "mixing",
                 "current_step": "🎚️ Creating optimal mix order...",
-                "progress": 50
-            })
-            ordered_songs = generator.create_mix_order(downloaded_songs)
-            
-            # Phase 4: Export with FFmpeg
-            export_jobs[job_id].update({
-                "status": "exporting",
-                "current_step": "🎬 Preparing video segments...",
-                "progress": 55
+                "progress": 85
             })
+            ordered_songs = generator.create_mix_order([analyzed[i] for i in sorted(analyzed)])
+            plan_indexes = {id(song): i for i, song in analyzed.items()}
             
-            # Prepare segments for the exporter
             # The exporter expects a list of dicts with: video_path, start, end, title, artist
             segments_for_export = []
             for song in ordered_songs:
@@ -1905,91 +2603,65 @@ async def approve_ai_plan(request: AIApproveRequest, background_tasks: Backgroun
                     "language": song.original.language
                 })
             
-            # Generate output path - use absolute path from settings
-            output_dir = settings.exports_dir
-            output_dir.mkdir(parents=True, exist_ok=True)
-            output_filename = f"ai_mix_{job_id[:8]}.mp4"
-            output_path = output_dir / output_filename
-            
-            # Use the exporter to create the final mix
-            # Create a progress callback for export phase with time tracking
-            export_times = []
-            export_phase_start = time.time()
-            
-            def export_progress(segment_idx: int, total: int, step: str, segment_time: float = None):
-                if segment_time:
-                    export_times.append(segment_time)
-                
-                # Calculate ETA
-                remaining = total - segment_idx
-                avg_time = sum(export_times) / len(export_times) if export_times else 15  # Default 15s per segment
-                eta_seconds = int(remaining * avg_time)
-                eta_str = f"~{eta_seconds//60}m {eta_seconds%60}s" if eta_seconds >= 60 else f"~{eta_seconds}s"
-                
-                base_progress = 55
-                export_range = 30  # 55% to 85%
-                segment_progress = (segment_idx / total) * export_range
-                export_jobs[job_id].update({
-                    "current_step": f"🎬 {step} ({segment_idx}/{total}) [{eta_str}]",
-                    "progress": int(base_progress + segment_progress),
-                    "segment_index": segment_idx,
-                    "eta_seconds": eta_seconds
-                })
-            
-            # Use create_transition_concat for smooth crossfades and visible transitions
-            from services.exporter import create_transition_concat, extract_and_overlay_segment
+            kept = [plan_indexes[id(song)] for song in ordered_songs if plan_indexes[id(song)] in extracted]
+            if not kept:
+                raise Exception("Failed to process any segments")
             
-            # First extract all segments with overlays
-            temp_segments = []
-            for i, seg in enumerate(segments_for_export):
-                segment_start = time.time()
-                export_progress(i + 1, len(segments_for_export), f"Processing {seg['title']}")
-                
-                temp_path = output_dir / f"temp_seg_{job_id[:8]}_{i}.mp4"
-                success = extract_and_overlay_segment(
-                    video_path=Path(seg['video_path']),
-                    output_path=temp_path,
-                    start_time=seg['start'],
-                    end_time=seg['end'],
-                    title=seg['title'],
-                    artist=seg['artist'],
-                    language=seg.get('language')
-                )
-                if success and temp_path.exists():
-                    temp_segments.append(temp_path)
-                    # Update with actual time taken
-                    export_progress(i + 1, len(segments_for_export), f"✅ {seg['title']}", time.time() - segment_start)
+            # A lone segment is copied straight to the output, so if it got the
+            # fast intermediate encode, redo it at final quality
+            if len(kept) == 1 and len(song_recs) > 1:
+                i = kept[0]
+                update_export_job(job_id, {"current_step": f"🎬 Finalizing: {song_recs[i].title}"})
+                try:
+                    final_path = extract_one(i, analyzed[i], intermediate=False, suffix="_final")
+                except BaseException:
+                    extracted[i].unlink(missing_ok=True)
+                    (output_dir / f"temp_seg_{job_id[:8]}_{i}_final.mp4").unlink(missing_ok=True)
+                    raise
+                if final_path:
+                    extracted.pop(i).unlink(missing_ok=True)
+                    extracted[i] = final_path
             
-            if not temp_segments:
-                raise Exception("Failed to process any segments")
+            temp_segments = [extracted[i] for i in kept]
             
             # Concatenate all segments with crossfade transitions
-            export_jobs[job_id].update({
+            update_export_job(job_id, {
                 "current_step": "✨ Creating crossfade transitions...",
                 "progress": 85
             })
             
             # Use create_transition_concat for smooth audio blending and visible video transitions
             # 3.5 second crossfades for music blending
-            success = create_transition_concat(
-                video_files=temp_segments, 
-                output_path=output_path, 
-                transition_type="random",
-                transition_duration=3.5
-            )
-            
-            # Cleanup temp files
-            for temp_path in temp_segments:
-                try:
-                    temp_path.unlink(missing_ok=True)
-                except:
-                    pass
+            try:
+                success = create_transition_concat(
+                    video_files=temp_segments, 
+                    output_path=output_path, 
+                    transition_type="random",
+                    transition_duration=3.5,
+                    cancel_event=cancel_event
+                )
+            finally:
+                # Cleanup temp files
+                for temp_path in temp_segments:
+                    try:
+                        temp_path.unlink(missing_ok=True)
+                    except:
+                        pass
             
-            if not success or not output_path.exists():
+            # One stat both confirms the mix exists and gives its size
+            try:
+                file_size = os.stat(output_path).st_size if success else None
+            except FileNotFoundError:
+                file_size = None
+            if file_size is None:
                 raise Exception("Export failed - output file not created")
             
+            if cancel_event.is_set():
+                output_path.unlink(missing_ok=True)
+                raise ExportCancelled()
+            
             # Add AI DJ Voice Commentary
-            export_jobs[job_id].update({
+            update_export_job(job_id, {
                 "current_step": "🎤 Preparing AI DJ voice...",
                 "progress": 90
             })
@@ -2000,7 +2672,7 @@ async def approve_ai_plan(request: AIApproveRequest, background_tasks: Backgroun
                 
                 # Progress callback for detailed DJ status updates
                 def dj_progress_callback(step: str, detail: str = ""):
-                    export_jobs[job_id].update({
+                    update_export_job(job_id, {
                         "current_step": f"🎤 {step}" + (f" - {detail}" if detail else ""),
                         "dj_detail": detail
                     })
@@ -2037,8 +2709,8 @@ async def approve_ai_plan(request: AIApproveRequest, background_tasks: Backgroun
                 # Output to temp file, then replace
                 dj_output = output_path.parent / f"dj_{job_id[:8]}.mp4"
                 
-                print(f"[AI_EXPORT] Adding DJ voice with theme: {plan_theme}", flush=True)
-                print(f"[AI_EXPORT] Shoutouts: {plan_shoutouts}", flush=True)
+                export_log.info(f"Adding DJ voice with theme: {plan_theme}")
+                export_log.info(f"Shoutouts: {plan_shoutouts}")
                 
                 dj_success, dj_timeline = add_creative_dj_commentary_to_video(
                     video_path=output_path,
@@ -2050,39 +2722,39 @@ async def approve_ai_plan(request: AIApproveRequest, background_tasks: Backgroun
                     progress_callback=dj_progress_callback
                 )
                 
-                if dj_success and dj_output.exists():
-                    # Replace original with DJ version
-                    import shutil
-                    shutil.move(str(dj_output), str(output_path))
-                    print(f"[AI_EXPORT] DJ voice added successfully!", flush=True)
+                try:
+                    dj_size = os.stat(dj_output).st_size if dj_success else None
+                except FileNotFoundError:
+                    dj_size = None
+                
+                if dj_size is not None:
+                    # Replace original with DJ version; both live in output_dir, so
+                    # this is a rename (shutil.move copies on Windows when the target exists)
+                    try:
+                        os.replace(dj_output, output_path)
+                    except OSError:
+                        import shutil
+                        shutil.move(str(dj_output), str(output_path))
+                    file_size = dj_size
+                    export_log.info("DJ voice added successfully!")
                     
                     # Store DJ timeline for UI display
-                    export_jobs[job_id]["dj_timeline"] = dj_timeline
-                    export_jobs[job_id]["segment_info"] = segment_info
+                    update_export_job(job_id, {"dj_timeline": dj_timeline, "segment_info": segment_info})
                 else:
-                    print(f"[AI_EXPORT] DJ voice failed, keeping original video", flush=True)
+                    export_log.info("DJ voice failed, keeping original video")
                     dj_timeline = []
                     
             except Exception as dj_error:
-                print(f"[AI_EXPORT] DJ voice error (continuing without DJ): {dj_error}", flush=True)
-                import traceback
-                traceback.print_exc()
+                export_log.exception(f"DJ voice error (continuing without DJ): {dj_error}")
                 dj_timeline = []
             
-            # Get file size
-            file_size = output_path.stat().st_size
-            
-            # Calculate total duration
-            total_duration = sum(
-                seg['end'] - seg['start'] 
-                for seg in segments_for_export
-            )
-            
-            # Build song timeline for UI
+            # Build song timeline for UI, summing the total duration in the same pass
             song_timeline = []
+            total_duration = 0.0
             cumulative = 4.0  # Intro duration
             for seg in segments_for_export:
                 seg_dur = seg['end'] - seg['start']
+                total_duration += seg_dur
                 song_timeline.append({
                     "title": seg['title'],
                     "artist": seg['artist'],
@@ -2094,7 +2766,7 @@ async def approve_ai_plan(request: AIApproveRequest, background_tasks: Backgroun
                 cumulative += seg_dur - 3.5  # Subtract transition overlap
             
             # Mark complete with real results including timeline
-            export_jobs[job_id].update({
+            update_export_job(job_id, {
                 "status": "complete",
                 "progress": 100,
                 "current_step": "✅ Mix complete! Ready to download",
@@ -2110,19 +2782,27 @@ async def approve_ai_plan(request: AIApproveRequest, background_tasks: Backgroun
                 }
             })
             
+        except ExportCancelled:
+            export_log.info(f"Job {job_id} cancelled")
+            update_export_job(job_id, {
+                "status": "cancelled",
+                "current_step": "Export cancelled"
+            })
         except Exception as e:
-            import traceback
-            traceback.print_exc()
-            export_jobs[job_id].update({
+            export_log.exception(f"Job {job_id} failed: {e}")
+            update_export_job(job_id, {
                 "status": "failed",
                 "current_step": f"Error: {str(e)}",
                 "error": str(e)
             })
+        finally:
+            export_cancel_events.pop(job_id, None)
+            checkpoint_job(job_id, export_jobs[job_id], force=True)
     
-    print(f"[APPROVE] Adding background task for job {job_id}")
+    print(f"[APPROVE] Queueing export for job {job_id}")
     print(f"[APPROVE] Songs in plan: {len(songs)}")
-    background_tasks.add_task(run_ai_export)
-    print(f"[APPROVE] Background task added, returning response")
+    submit_export(job_id, run_ai_export)
+    print(f"[APPROVE] Export queued, returning response")
     
     return {
         "success": True,
@@ -2137,7 +2817,7 @@ async def yolo_generate(db: Session = Depends(get_db)):
     from models.database import AIPlaylistPlan
     import random
     
-    session_id = str(uuid.uuid4())
+    session_id = uuid.uuid4().hex
     
     themes = [
         ("New Year's Party 2026! 🎉", ["pop", "dance", "latin"]),
@@ -2150,20 +2830,20 @@ async def yolo_generate(db: Session = Depends(get_db)):
     theme, genres = random.choice(themes)
     
     plan = AIPlaylistPlan(
-        id=str(uuid.uuid4()),
+        id=uuid.uuid4().hex,
         session_id=session_id,
         theme=theme,
-        mood=json.dumps(["energetic", "fun", "party"]),
-        languages=json.dumps(["English", "Spanish", "Hindi"]),
+        mood=["energetic", "fun", "party"],
+        languages=["English", "Spanish", "Hindi"],
         duration_minutes=20,
         status="approved",
-        shoutouts=json.dumps(["Let's gooo! 🔥", "Party time!"]),
-        commentary_samples=json.dumps(["Welcome to the party!", "This track is fire!"]),
-        conversation_history="[]"
+        shoutouts=["Let's gooo! 🔥", "Party time!"],
+        commentary_samples=["Welcome to the party!", "This track is fire!"],
+        conversation_history=[]
     )
     db.add(plan)
     
-    job_id = str(uuid.uuid4())
+    job_id = uuid.uuid4().hex
     plan.export_job_id = job_id
     db.commit()
     
@@ -2178,54 +2858,137 @@ async def yolo_generate(db: Session = Depends(get_db)):
 
 # ============== WebSocket Export Progress ==============
 
-@router.websocket("/ws/export/{job_id}")
-async def websocket_export_progress(websocket: WebSocket, job_id: str):
-    """WebSocket for real-time export progress updates."""
+def _export_progress_frame(job_id: str) -> dict:
+    """Build the progress frame sent to WebSocket subscribers of a job."""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return {
+            "job_id": job_id,
+            "status": "not_found",
+            "error": "Job not found, waiting..."
+        }
+    return {
+        "job_id": job_id,
+        "status": job.get("status", "pending"),
+        "progress": job.get("progress", 0),
+        "current_step": job.get("current_step", ""),
+        "segment_index": job.get("segment_index", 0),
+        "total_segments": job.get("total_segments", 0),
+        "error": job.get("error"),
+        "result": job.get("result")
+    }
+
+
+async def _fan_out(job_id: str, payload: str):
+    """Send one encoded frame to every subscriber, pruning dead sockets."""
+    subscribers = job_subscribers.get(job_id)
+    if not subscribers:
+        return
+    sockets = list(subscribers)
+    results = await asyncio.gather(
+        *(ws.send_text(payload) for ws in sockets),
+        return_exceptions=True
+    )
+    for ws, outcome in zip(sockets, results):
+        if isinstance(outcome, Exception):
+            subscribers.discard(ws)
+
+
+async def _broadcast_export_progress(job_id: str):
+    """Wait for changes to one job and broadcast them to all of its subscribers."""
+    changed = asyncio.Event()
+    _export_job_wakeups[job_id] = (asyncio.get_running_loop(), changed)
+    # Subscribers already received the current frame on connect. Only status
+    # and progress changes are worth a frame; step text rides along with them.
+    first = _export_progress_frame(job_id)
+    last_sent = (first["status"], first.get("progress"))
+    try:
+        while job_subscribers.get(job_id):
+            # Clear before reading so an update during the send wakes us again;
+            # updates that land while we send collapse into the next frame
+            changed.clear()
+            frame = _export_progress_frame(job_id)
+            status = frame["status"]
+            key = (status, frame.get("progress"))
+            
+            if key != last_sent or status in _TERMINAL_STATUSES:
+                await _fan_out(job_id, json_dumps(frame))
+                last_sent = key
+            
+            if status in _TERMINAL_STATUSES:
+                sockets = list(job_subscribers.get(job_id, ()))
+                await asyncio.gather(*(ws.close() for ws in sockets), return_exceptions=True)
+                break
+            
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=EXPORT_PROGRESS_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _export_job_wakeups.pop(job_id, None)
+        _job_broadcasters.pop(job_id, None)
+        job_subscribers.pop(job_id, None)
+
+
+async def serve_export_progress(websocket: WebSocket, job_id: str):
+    """
+    Subscribe a WebSocket to export progress for a job.
+    
+    The current state is sent immediately; later updates are pushed by the
+    shared per-job broadcaster, so N viewers of one export cost a single encode.
+    """
     await websocket.accept()
     
     try:
-        last_progress = -1
+        frame = _export_progress_frame(job_id)
+        await websocket.send_text(json_dumps(frame))
+        if frame["status"] in _TERMINAL_STATUSES:
+            await websocket.close()
+            return
+        
+        job_subscribers[job_id].add(websocket)
+        if job_id not in _job_broadcasters:
+            _job_broadcasters[job_id] = asyncio.create_task(_broadcast_export_progress(job_id))
+        
+        # Clients never send anything; receiving only detects the disconnect
         while True:
-            # Check export_jobs dict
-            if job_id in export_jobs:
-                job = export_jobs[job_id]
-                progress = job.get("progress", 0)
-                status = job.get("status", "pending")
-                
-                if progress != last_progress or status in ("complete", "failed"):
-                    await websocket.send_json({
-                        "job_id": job_id,
-                        "status": status,
-                        "progress": progress,
-                        "current_step": job.get("current_step", ""),
-                        "segment_index": job.get("segment_index", 0),
-                        "total_segments": job.get("total_segments", 0),
-                        "error": job.get("error"),
-                        "result": job.get("result")
-                    })
-                    last_progress = progress
-                
-                if status in ("complete", "failed"):
-                    break
-            else:
-                await websocket.send_json({
-                    "job_id": job_id,
-                    "status": "not_found",
-                    "error": "Job not found, waiting..."
-                })
-            
-            await asyncio.sleep(0.5)
+            await websocket.receive_text()
             
     except WebSocketDisconnect:
         print(f"WebSocket disconnected for job {job_id}")
     except Exception as e:
         print(f"WebSocket error: {e}")
+    finally:
+        subscribers = job_subscribers.get(job_id)
+        if subscribers is not None:
+            subscribers.discard(websocket)
+
+
+@router.websocket("/ws/export/{job_id}")
+async def websocket_export_progress(websocket: WebSocket, job_id: str):
+    """WebSocket for real-time export progress updates."""
+    await serve_export_progress(websocket, job_id)
 
 
 @router.post("/export/{job_id}/cancel")
-async def cancel_export(job_id: str):
-    """Cancel an in-progress export."""
-    if job_id in export_jobs:
-        export_jobs[job_id]["status"] = "cancelled"
-        return {"success": True, "message": "Export cancelled"}
-    return {"success": False, "message": "Job not found"}
\ No newline at end of file
+async def cancel_export(job_id: str, response: Response):
+    """Cancel an in-progress export. Cancelling a finished job is a no-op."""
+    response.headers["Cache-Control"] = "no-store"
+    
+    job = export_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": "JOB_NOT_FOUND"},
+            headers={"Cache-Control": "no-store"}
+        )
+    
+    if job.get("status") in _TERMINAL_STATUSES:
+        return {"success": True, "message": f"Export already {job['status']}"}
+    
+    cancel_event = export_cancel_events.get(job_id)
+    if cancel_event is not None:
+        cancel_event.set()
+    job = update_export_job(job_id, {"status": "cancelled"})
+    await run_in_threadpool(checkpoint_job, job_id, job, force=True)
+    return {"success": True, "message": "Export cancelled"}
\ No newline at end of file
@@ -4,6 +4,8 @@ Video DJ Playlist Creator - Configuration
 
 import os
 from pathlib import Path
+from types import MappingProxyType
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
@@ -58,6 +60,10 @@ class Settings(BaseSettings):
     # Export settings
     default_crossfade_duration: float = 2.0  # seconds
     target_playlist_duration: int = 2700  # 45 minutes
+    max_concurrent_exports: int = 2  # further exports queue until a slot frees
+    
+    # Job state shared across workers (optional, e.g. redis://localhost:6379/0)
+    redis_url: Optional[str] = None
     
     def ensure_directories(self):
         """Create all required directories."""
@@ -70,7 +76,7 @@ class Settings(BaseSettings):
 
 
 # Search queries for each language - focus on biggest hits by year
-SEARCH_QUERIES = {
+_SEARCH_QUERIES = {
     "english": {
         "2024": "biggest dance hits 2024 official music video",
         "2023": "top dance songs 2023 most viewed official video",
@@ -115,8 +121,14 @@ SEARCH_QUERIES = {
     }
 }
 
+# Read-only views, shared by concurrent discovery threads
+SEARCH_QUERIES = MappingProxyType({
+    language: MappingProxyType(queries) for language, queries in _SEARCH_QUERIES.items()
+})
+
 # Supported languages
-SUPPORTED_LANGUAGES = list(SEARCH_QUERIES.keys())
+SUPPORTED_LANGUAGES = tuple(SEARCH_QUERIES)
+SUPPORTED_LANGUAGES_SET = frozenset(SUPPORTED_LANGUAGES)
 
 # Create global settings instance
 settings = Settings()
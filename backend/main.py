@@ -28,15 +28,53 @@ for ffmpeg_path in ffmpeg_paths:
 sys.path.insert(0, str(backend_dir))
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+import hashlib
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from fastapi import FastAPI, WebSocket
+from starlette.datastructures import Headers, MutableHeaders
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import uvicorn
-import asyncio
+
+# Optional: faster hashing for ETags
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    xxhash = None
+    XXHASH_AVAILABLE = False
+
+# Optional: C JSON encoder for all responses
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
+    ORJSON_AVAILABLE = False
 
 from config import settings
 from models.database import init_database
-from api.routes import router, export_jobs
+from api.routes import router, serve_export_progress, export_jobs, shutdown_analysis_pool, shutdown_export_pool
+from services.job_store import load_jobs
+
+
+def start_export_logging() -> QueueListener:
+    """Write AI export logs to stdout from a background listener thread."""
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("[AI_EXPORT] %(message)s"))
+    
+    export_logger = logging.getLogger("ai_export")
+    export_logger.setLevel(logging.INFO)
+    export_logger.propagate = False
+    export_logger.handlers = [QueueHandler(log_queue)]
+    
+    listener = QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
 
 
 @asynccontextmanager
@@ -44,15 +82,19 @@ async def lifespan(app: FastAPI):
     """Application lifespan - startup and shutdown."""
     # Startup
     print(f"Starting {settings.app_name} v{settings.app_version}")
+    log_listener = start_export_logging()
     
     # Ensure directories exist
     settings.ensure_directories()
     print(f"Data directory: {settings.base_dir}")
     
     # Initialize database
-    init_database(settings.database_path)
+    database = init_database(settings.database_path)
     print(f"Database: {settings.database_path}")
     
+    # Restore export jobs from the last run
+    export_jobs.update(load_jobs())
+    
     print(f"Server running at http://{settings.host}:{settings.port}")
     print("=" * 50)
     
@@ -60,6 +102,10 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("Shutting down...")
+    shutdown_analysis_pool()
+    shutdown_export_pool()
+    await database.close()
+    log_listener.stop()
 
 
 # Create FastAPI app
@@ -67,6 +113,7 @@ app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="Automated video DJ playlist creator",
+    default_response_class=DefaultResponse,
     lifespan=lifespan
 )
 
@@ -79,58 +126,95 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+
+def compute_etag(body: bytes) -> str:
+    """Compute a strong ETag for a response body."""
+    if XXHASH_AVAILABLE:
+        digest = xxhash.xxh64(body).hexdigest()
+    else:
+        digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+
+class ETagMiddleware:
+    """
+    Add ETags to JSON GET responses and answer matching If-None-Match with 304.
+    
+    Written as plain ASGI so only JSON bodies are buffered; file downloads and
+    event streams pass straight through to the server.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        
+        start_message = None
+        body_parts = []
+        passthrough = False
+        
+        async def send_with_etag(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (
+                    message["status"] != 200
+                    or not headers.get("content-type", "").startswith("application/json")
+                    or "no-store" in headers.get("cache-control", "")
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+            
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            
+            body = b"".join(body_parts)
+            etag = compute_etag(body)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["ETag"] = etag
+            
+            if_none_match = Headers(scope=scope).get("if-none-match", "")
+            if if_none_match == "*" or etag in (tag.strip() for tag in if_none_match.split(",")):
+                del headers["content-length"]
+                del headers["content-type"]
+                start_message["status"] = 304
+                body = b""
+            
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+        
+        await self.app(scope, receive, send_with_etag)
+
+
+app.add_middleware(ETagMiddleware)
+
+
 # Include API routes
 app.include_router(router, prefix="/api")
 
-# Mount static files for exports
-exports_dir = settings.base_dir / "exports"
-exports_dir.mkdir(parents=True, exist_ok=True)
-app.mount("/exports", StaticFiles(directory=str(exports_dir)), name="exports")
+# Mount static files for exports. StaticFiles checks the directory when it is
+# constructed, before lifespan's ensure_directories() runs, so create it here.
+settings.exports_dir.mkdir(parents=True, exist_ok=True)
+app.mount("/exports", StaticFiles(directory=str(settings.exports_dir)), name="exports")
 
 
 # WebSocket endpoint at root level (not under /api prefix)
 @app.websocket("/ws/export/{job_id}")
 async def websocket_export_progress(websocket: WebSocket, job_id: str):
     """WebSocket for real-time export progress updates."""
-    await websocket.accept()
-    
-    try:
-        last_progress = -1
-        while True:
-            # Check export_jobs dict from routes
-            if job_id in export_jobs:
-                job = export_jobs[job_id]
-                progress = job.get("progress", 0)
-                status = job.get("status", "pending")
-                
-                if progress != last_progress or status in ("complete", "failed"):
-                    await websocket.send_json({
-                        "job_id": job_id,
-                        "status": status,
-                        "progress": progress,
-                        "current_step": job.get("current_step", ""),
-                        "segment_index": job.get("segment_index", 0),
-                        "total_segments": job.get("total_segments", 0),
-                        "error": job.get("error"),
-                        "result": job.get("result")
-                    })
-                    last_progress = progress
-                
-                if status in ("complete", "failed"):
-                    break
-            else:
-                await websocket.send_json({
-                    "job_id": job_id,
-                    "status": "not_found",
-                    "error": "Job not found, waiting..."
-                })
-            
-            await asyncio.sleep(0.5)
-            
-    except WebSocketDisconnect:
-        print(f"WebSocket disconnected for job {job_id}")
-    except Exception as e:
-        print(f"WebSocket error: {e}")
+    await serve_export_progress(websocket, job_id)
 
 
 @app.get("/")
@@ -10,6 +10,9 @@ from .database import (
     Database,
     init_database,
     get_db,
+    get_async_db,
+    background_session,
+    new_session,
 )
 
 __all__ = [
@@ -22,4 +25,7 @@ __all__ = [
     "Database",
     "init_database",
     "get_db",
+    "get_async_db",
+    "background_session",
+    "new_session",
 ]
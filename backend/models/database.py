@@ -2,15 +2,37 @@
 Database models and setup using SQLAlchemy.
 """
 
+import os
+import json
+import itertools
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import create_engine, Column, String, Integer, Float, Boolean, Text, ForeignKey, Index
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy import event, create_engine, func, Column, String, Integer, Float, Boolean, Text, JSON, LargeBinary, ForeignKey, Index
+from sqlalchemy.orm import Session, declarative_base, relationship, scoped_session, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from pathlib import Path
 
+# Optional: C JSON codec for the JSON columns
+try:
+    import orjson
+
+    def _json_serializer(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    _json_deserializer = orjson.loads
+except ImportError:
+    _json_serializer = json.dumps
+    _json_deserializer = json.loads
+
 Base = declarative_base()
 
 
+def _utcnow_sql():
+    """ISO-8601 UTC timestamp computed by SQLite inside the INSERT itself."""
+    return func.strftime("%Y-%m-%dT%H:%M:%f", "now")
+
+
 class Song(Base):
     """Song model - represents a YouTube video."""
     
@@ -29,15 +51,16 @@ class Song(Base):
     cached_audio_path = Column(String, nullable=True)
     cached_video_path = Column(String, nullable=True)
     error_message = Column(Text, nullable=True)
-    created_at = Column(String, default=lambda: datetime.utcnow().isoformat())
-    updated_at = Column(String, default=lambda: datetime.utcnow().isoformat(), onupdate=lambda: datetime.utcnow().isoformat())
+    created_at = Column(String, default=_utcnow_sql())
+    updated_at = Column(String, default=_utcnow_sql(), onupdate=lambda: datetime.utcnow().isoformat())
     
     # Relationships
     segments = relationship("Segment", back_populates="song", cascade="all, delete-orphan")
     
     __table_args__ = (
         Index("idx_songs_language", "language"),
-        Index("idx_songs_status", "analysis_status"),
+        Index("idx_songs_status_language", "analysis_status", "language"),
+        Index("idx_songs_created", "created_at"),
     )
 
 
@@ -55,7 +78,7 @@ class Segment(Base):
     is_primary = Column(Boolean, default=False)  # highest energy segment
     label = Column(String, nullable=True)  # 'chorus_1', 'drop', etc.
     cached_clip_path = Column(String, nullable=True)
-    created_at = Column(String, default=lambda: datetime.utcnow().isoformat())
+    created_at = Column(String, default=_utcnow_sql())
     
     # Relationships
     song = relationship("Song", back_populates="segments")
@@ -63,6 +86,7 @@ class Segment(Base):
     
     __table_args__ = (
         Index("idx_segments_song", "song_id"),
+        Index("idx_segments_energy", energy_score.desc()),
     )
 
 
@@ -74,12 +98,13 @@ class Playlist(Base):
     id = Column(String, primary_key=True)  # UUID
     name = Column(String, nullable=False)
     target_duration = Column(Integer, default=2700)  # 45 minutes
-    created_at = Column(String, default=lambda: datetime.utcnow().isoformat())
-    updated_at = Column(String, default=lambda: datetime.utcnow().isoformat(), onupdate=lambda: datetime.utcnow().isoformat())
+    created_at = Column(String, default=_utcnow_sql())
+    updated_at = Column(String, default=_utcnow_sql(), onupdate=lambda: datetime.utcnow().isoformat())
     
     # Relationships
     items = relationship("PlaylistItem", back_populates="playlist", cascade="all, delete-orphan", order_by="PlaylistItem.position")
     export_jobs = relationship("ExportJob", back_populates="playlist")
+    dj_context = relationship("PlaylistDJContext", uselist=False, cascade="all, delete-orphan")
 
 
 class PlaylistItem(Base):
@@ -92,7 +117,7 @@ class PlaylistItem(Base):
     segment_id = Column(String, ForeignKey("segments.id"), nullable=False)
     position = Column(Integer, nullable=False)
     crossfade_duration = Column(Float, default=2.0)
-    created_at = Column(String, default=lambda: datetime.utcnow().isoformat())
+    created_at = Column(String, default=_utcnow_sql())
     
     # Relationships
     playlist = relationship("Playlist", back_populates="items")
@@ -100,9 +125,21 @@ class PlaylistItem(Base):
     
     __table_args__ = (
         Index("idx_playlist_items_playlist", "playlist_id"),
+        Index("idx_playlist_items_playlist_position", "playlist_id", "position"),
+        Index("idx_playlist_items_segment", "segment_id"),
     )
 
 
+class PlaylistDJContext(Base):
+    """PlaylistDJContext model - DJ theme, mood and shoutouts saved for a playlist."""
+    
+    __tablename__ = "playlist_dj_contexts"
+    
+    playlist_id = Column(String, ForeignKey("playlists.id"), primary_key=True)
+    context = Column(Text, nullable=False)  # JSON object
+    updated_at = Column(String, default=_utcnow_sql())
+
+
 class ExportJob(Base):
     """ExportJob model - tracks video export progress."""
     
@@ -119,7 +156,7 @@ class ExportJob(Base):
     started_at = Column(String, nullable=True)
     completed_at = Column(String, nullable=True)
     error_message = Column(Text, nullable=True)
-    created_at = Column(String, default=lambda: datetime.utcnow().isoformat())
+    created_at = Column(String, default=_utcnow_sql())
     
     # Relationships
     playlist = relationship("Playlist", back_populates="export_jobs")
@@ -137,40 +174,177 @@ class AIPlaylistPlan(Base):
     session_id = Column(String, unique=True, index=True, nullable=False)
     user_prompt = Column(Text, nullable=True)
     theme = Column(String, nullable=True)
-    mood = Column(Text, nullable=True)  # JSON array stored as text
-    songs = Column(Text, nullable=True)  # JSON array of song objects
-    commentary_samples = Column(Text, nullable=True)  # JSON array
-    cultural_phrases = Column(Text, nullable=True)  # JSON array
-    shoutouts = Column(Text, nullable=True)  # JSON array
-    languages = Column(Text, nullable=True)  # JSON array
+    mood = Column(JSON, nullable=True)  # JSON array
+    songs = Column(JSON, nullable=True)  # JSON array of song objects
+    commentary_samples = Column(JSON, nullable=True)  # JSON array
+    cultural_phrases = Column(JSON, nullable=True)  # JSON array
+    shoutouts = Column(JSON, nullable=True)  # JSON array
+    languages = Column(JSON, nullable=True)  # JSON array
     duration_minutes = Column(Integer, default=30)
     status = Column(String, default="draft")  # draft, approved, generating, complete, failed
-    conversation_history = Column(Text, nullable=True)  # JSON array of messages
+    conversation_history = Column(JSON, nullable=True)  # JSON array of messages
     export_job_id = Column(String, nullable=True)
-    created_at = Column(String, default=lambda: datetime.utcnow().isoformat())
-    updated_at = Column(String, default=lambda: datetime.utcnow().isoformat())
+    created_at = Column(String, default=_utcnow_sql())
+    updated_at = Column(String, default=_utcnow_sql())
+
+
+class YouTubeSearchCache(Base):
+    """Cached top YouTube search result, keyed by a hash of the normalized query."""
+    __tablename__ = "youtube_search_cache"
+
+    query_hash = Column(String, primary_key=True)  # sha1 of normalized query
+    video_id = Column(String, nullable=False)
+    title = Column(String, nullable=True)
+    url = Column(String, nullable=False)
+    duration = Column(Integer, nullable=True)  # seconds
+    cached_at = Column(Float, nullable=False)  # unix timestamp
+
+
+class AnalysisCache(Base):
+    """Cached BPM and energy curve of an audio file, keyed by path, size and mtime."""
+    __tablename__ = "analysis_cache"
+
+    audio_hash = Column(String, primary_key=True)  # blake2b of path:size:mtime
+    bpm = Column(Float, nullable=False)
+    overall_energy = Column(Float, nullable=False)
+    energy_curve = Column(LargeBinary, nullable=False)  # float32 bytes
+    cached_at = Column(Float, nullable=False)  # unix timestamp
+
+# ============== Data Versions ==============
+
+# Bumped after every committed write to each group of tables, so read
+# endpoints can cache responses keyed on them. next() on a count is atomic.
+VERSIONED_MODELS = {
+    "library": (Song, Segment),
+    "playlists": (Playlist, PlaylistItem, PlaylistDJContext),
+}
+_version_counters = {group: itertools.count(1) for group in VERSIONED_MODELS}
+_versions = {group: 0 for group in VERSIONED_MODELS}
+
+
+def get_library_version() -> int:
+    """Current version of the song library."""
+    return _versions["library"]
+
+
+def get_playlist_version() -> int:
+    """Current version of playlists and their items."""
+    return _versions["playlists"]
+
+
+def _mark_changed(session, classes):
+    changed = session.info.setdefault("changed_groups", set())
+    for group, models in VERSIONED_MODELS.items():
+        if any(issubclass(cls, models) for cls in classes):
+            changed.add(group)
+
+
+def mark_changed(*groups: str):
+    """Bump the versions of groups written outside an ORM Session (raw sqlite3)."""
+    for group in groups:
+        _versions[group] = next(_version_counters[group])
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context):
+    classes = {type(obj) for obj in (*session.new, *session.dirty, *session.deleted)}
+    _mark_changed(session, classes)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statements(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _mark_changed(orm_execute_state.session, (mapper.class_,))
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_versions(session):
+    mark_changed(*session.info.pop("changed_groups", ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("changed_groups", None)
+
+
+# Applied to every new connection: WAL lets readers run alongside the
+# analysis/export writers, and NORMAL sync is safe under WAL
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",  # 64 MB page cache
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256 MB
+)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
 
 class Database:
     """Database connection manager."""
     
     def __init__(self, db_path: Path):
         self.db_path = db_path
-        self.engine = create_engine(f"sqlite:///{db_path}", echo=False)
+        # No pre-ping: a local SQLite file has no server to drop idle connections
+        self.engine = create_engine(
+            f"sqlite:///{db_path}", echo=False,
+            json_serializer=_json_serializer, json_deserializer=_json_deserializer
+        )
+        event.listen(self.engine, "connect", _apply_sqlite_pragmas)
         self.SessionLocal = sessionmaker(bind=self.engine)
+        # One session per thread for background tasks
+        self.ScopedSession = scoped_session(self.SessionLocal)
+        # Async engine for read endpoints so queries don't block the event loop;
+        # their sessions never write, so they skip autoflush
+        self.async_engine = create_async_engine(
+            f"sqlite+aiosqlite:///{db_path}", echo=False,
+            json_serializer=_json_serializer, json_deserializer=_json_deserializer
+        )
+        event.listen(self.async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+        self.AsyncSessionLocal = async_sessionmaker(bind=self.async_engine, autoflush=False, expire_on_commit=False)
     
     def create_tables(self):
-        """Create all tables."""
+        """Create all tables, plus any indexes added since the tables were created."""
         Base.metadata.create_all(self.engine)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(self.engine, checkfirst=True)
     
     def get_session(self):
         """Get a new database session."""
         return self.SessionLocal()
+    
+    def get_async_session(self) -> AsyncSession:
+        """Get a new async database session."""
+        return self.AsyncSessionLocal()
+    
+    async def close(self):
+        """Dispose of pooled connections."""
+        await self.async_engine.dispose()
+        self.engine.dispose()
 
 
 # Global database instance (initialized in main.py)
 db: Optional[Database] = None
 
 
+def _dispose_after_fork():
+    """Forked workers must not reuse the parent's pooled connections."""
+    if db is not None:
+        db.engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
 def init_database(db_path: Path) -> Database:
     """Initialize the database."""
     global db
@@ -188,3 +362,30 @@ def get_db():
         yield session
     finally:
         session.close()
+
+
+def new_session() -> Session:
+    """Open a session owned by the caller, for work that outlives a request."""
+    if db is None:
+        raise RuntimeError("Database not initialized")
+    return db.get_session()
+
+
+@contextmanager
+def background_session():
+    """Thread-scoped session for background tasks, sharing the app's engine."""
+    if db is None:
+        raise RuntimeError("Database not initialized")
+    session = db.ScopedSession()
+    try:
+        yield session
+    finally:
+        db.ScopedSession.remove()
+
+
+async def get_async_db():
+    """Async dependency for FastAPI routes that only read."""
+    if db is None:
+        raise RuntimeError("Database not initialized")
+    async with db.get_async_session() as session:
+        yield session
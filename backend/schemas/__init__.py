@@ -3,8 +3,9 @@ Pydantic schemas for API request/response validation.
 """
 
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Type, TypeVar
 from pydantic import BaseModel, Field
+from starlette.responses import Response
 
 
 # ============== Song Schemas ==============
@@ -309,3 +310,20 @@ class ErrorResponse(BaseModel):
     message: str
     details: Optional[dict] = None
 
+
+# ============== Response Helpers ==============
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def from_row(model: Type[ModelT], row, **values) -> ModelT:
+    """Build a response model from a trusted DB row without re-validating it."""
+    for name in model.model_fields:
+        if name not in values and hasattr(row, name):
+            values[name] = getattr(row, name)
+    return model.model_construct(**values)
+
+
+def as_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Serialize a response model once, skipping FastAPI's re-validation of the return value."""
+    return Response(content=model.model_dump_json(), status_code=status_code, media_type="application/json")
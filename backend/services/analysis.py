@@ -9,10 +9,12 @@ Uses librosa for:
 """
 
 import os
+import uuid
 from pathlib import Path
 from typing import List, Optional, Tuple
 from dataclasses import dataclass
 import numpy as np
+from scipy.ndimage import uniform_filter1d
 
 try:
     import librosa
@@ -20,6 +22,10 @@ except ImportError:
     librosa = None
 
 from config import settings
+from services.analysis_cache import analysis_cache_key, get_cached_analysis, cache_analysis
+
+# FFT size for the shared spectrogram (librosa's default for every feature used)
+STFT_N_FFT = 2048
 
 
 @dataclass
@@ -47,23 +53,33 @@ def calculate_energy_curve(y: np.ndarray, sr: int, hop_length: int = 512) -> np.
     Compute composite energy score across time.
     Combines RMS (volume), spectral centroid (brightness), and onset strength (punch).
     
-    Returns array of energy values (0-1) per audio frame.
+    Returns array of energy values (0-1) per audio frame, as float32.
     """
+    y = np.asarray(y, dtype=np.float32)
+    
+    # One STFT shared by every feature below
+    S = np.abs(librosa.stft(y, n_fft=STFT_N_FFT, hop_length=hop_length))
+    
     # Volume envelope (how loud)
-    rms = librosa.feature.rms(y=y, hop_length=hop_length)[0]
+    rms = librosa.feature.rms(S=S, frame_length=STFT_N_FFT, hop_length=hop_length)[0]
     
     # Spectral centroid (how bright/exciting) 
-    spectral = librosa.feature.spectral_centroid(y=y, sr=sr, hop_length=hop_length)[0]
+    spectral = librosa.feature.spectral_centroid(S=S, sr=sr, n_fft=STFT_N_FFT, hop_length=hop_length)[0]
     
-    # Onset strength (how punchy/rhythmic)
-    onset = librosa.onset.onset_strength(y=y, sr=sr, hop_length=hop_length)
+    # Onset strength (how punchy/rhythmic), from the log-power mel spectrogram
+    mel = librosa.feature.melspectrogram(S=S ** 2, sr=sr, n_fft=STFT_N_FFT, hop_length=hop_length)
+    onset = librosa.onset.onset_strength(S=librosa.power_to_db(mel), sr=sr, hop_length=hop_length)
     
-    # Normalize each to 0-1
+    # Normalize each to 0-1, in place as float32
     def normalize(arr):
+        arr = np.ascontiguousarray(arr, dtype=np.float32)
         arr_min, arr_max = arr.min(), arr.max()
-        if arr_max - arr_min < 1e-8:
+        arr_range = arr_max - arr_min
+        if arr_range < 1e-8:
             return np.zeros_like(arr)
-        return (arr - arr_min) / (arr_max - arr_min)
+        np.subtract(arr, arr_min, out=arr)
+        arr *= 1.0 / arr_range
+        return arr
     
     rms_norm = normalize(rms)
     spec_norm = normalize(spectral)
@@ -72,20 +88,22 @@ def calculate_energy_curve(y: np.ndarray, sr: int, hop_length: int = 512) -> np.
     # Resample to same length (use shortest)
     length = min(len(rms_norm), len(spec_norm), len(onset_norm))
     
-    # Weighted combination: RMS is most important for "energy"
-    energy = (
-        0.4 * rms_norm[:length] +
-        0.3 * spec_norm[:length] +
-        0.3 * onset_norm[:length]
-    )
+    # Weighted combination: RMS is most important for "energy".
+    # Accumulate into the RMS buffer to avoid temporaries.
+    energy = rms_norm[:length]
+    energy *= 0.4
+    for weight, feature in ((0.3, spec_norm), (0.3, onset_norm)):
+        part = feature[:length]
+        part *= weight
+        energy += part
     
     # Smooth the curve to reduce noise
     if len(energy) > 10:
         kernel_size = min(21, len(energy) // 5)
         if kernel_size % 2 == 0:
             kernel_size += 1
-        kernel = np.ones(kernel_size) / kernel_size
-        energy = np.convolve(energy, kernel, mode='same')
+        # Running-sum boxcar; constant mode keeps np.convolve's zero-padded edges
+        energy = uniform_filter1d(energy, size=kernel_size, mode='constant', cval=0.0)
     
     return energy
 
@@ -123,67 +141,55 @@ def find_peak_segments(
     window_frames = int((min_frames + max_frames) / 2)
     step_frames = window_frames // 4  # 75% overlap for better coverage
     
-    # Sliding window to find candidate regions
-    candidates = []
-    for start in range(0, len(energy) - min_frames, step_frames):
-        # Try to extend the window up to max_frames while energy stays high
-        best_end = start + min_frames
-        best_energy = np.mean(energy[start:best_end])
-        
-        for end in range(start + min_frames, min(start + max_frames + 1, len(energy)), step_frames // 2):
-            window_energy = np.mean(energy[start:end])
-            if window_energy >= best_energy * 0.95:  # Allow slight decrease
-                best_end = end
-                best_energy = window_energy
-        
-        candidates.append({
-            'start_frame': start,
-            'end_frame': best_end,
-            'energy': np.mean(energy[start:best_end])
-        })
-    
-    # Sort by energy (highest first)
-    candidates.sort(key=lambda x: x['energy'], reverse=True)
-    
-    # Select non-overlapping segments
+    # Sliding window to find candidate regions. Window means come from a
+    # prefix sum, and every start is extended in lockstep per window length.
+    csum = np.concatenate(([0.0], np.cumsum(energy, dtype=np.float64)))
+    starts = np.arange(0, len(energy) - min_frames, step_frames)
+    limits = np.minimum(starts + max_frames + 1, len(energy))
+    best_end = starts + min_frames
+    best_energy = (csum[best_end] - csum[starts]) / min_frames
+    
+    for length in range(min_frames, max_frames + 1, step_frames // 2):
+        ends = starts + length
+        valid = ends < limits
+        if not valid.any():
+            break
+        window_energy = (csum[np.minimum(ends, len(energy))] - csum[starts]) / length
+        # Try to extend the window while energy stays high (allow slight decrease)
+        extend = valid & (window_energy >= best_energy * 0.95)
+        best_end = np.where(extend, ends, best_end)
+        best_energy = np.where(extend, window_energy, best_energy)
+    
+    # Select non-overlapping segments, highest energy first. Picking a
+    # segment masks out every candidate too close to it.
+    order = np.argsort(-best_energy, kind='stable')
+    available = np.ones(len(starts), dtype=bool)
     selected = []
-    for candidate in candidates:
-        if len(selected) >= max_segments:
+    while len(selected) < max_segments:
+        remaining = available[order]
+        if not remaining.any():
             break
-        
-        # Check for overlap with already selected
-        overlaps = False
-        for seg in selected:
-            # Check if segments are too close
-            if not (candidate['end_frame'] + gap_frames < seg['start_frame'] or
-                    candidate['start_frame'] - gap_frames > seg['end_frame']):
-                overlaps = True
-                break
-        
-        if not overlaps:
-            selected.append(candidate)
+        pick = order[np.argmax(remaining)]
+        selected.append(pick)
+        available &= ((best_end + gap_frames < starts[pick]) |
+                      (starts - gap_frames > best_end[pick]))
     
     # Convert to DetectedSegment objects, sorted by start time
+    selected = np.sort(np.array(selected, dtype=np.intp))
+    sel_starts = starts[selected] / frames_per_second
+    sel_ends = best_end[selected] / frames_per_second
+    sel_energy = best_energy[selected]
+    
+    # The primary segment is the highest energy one
+    max_energy_idx = int(np.argmax(sel_energy)) if len(selected) else 0
+    
     segments = []
-    selected_sorted = sorted(selected, key=lambda x: x['start_frame'])
-    
-    # Find the primary (highest energy) segment
-    max_energy_idx = 0
-    max_energy = 0
-    for i, seg in enumerate(selected_sorted):
-        if seg['energy'] > max_energy:
-            max_energy = seg['energy']
-            max_energy_idx = i
-    
-    for i, seg in enumerate(selected_sorted):
-        start_time = seg['start_frame'] / frames_per_second
-        end_time = seg['end_frame'] / frames_per_second
-        
+    for i, (start_time, end_time, seg_energy) in enumerate(zip(sel_starts, sel_ends, sel_energy)):
         segments.append(DetectedSegment(
-            start_time=round(start_time, 2),
-            end_time=round(end_time, 2),
-            duration=round(end_time - start_time, 2),
-            energy_score=round(seg['energy'] * 100, 1),
+            start_time=round(float(start_time), 2),
+            end_time=round(float(end_time), 2),
+            duration=round(float(end_time - start_time), 2),
+            energy_score=round(float(seg_energy) * 100, 1),
             is_primary=(i == max_energy_idx),
             label=f'segment_{i + 1}'
         ))
@@ -222,28 +228,36 @@ def analyze_audio_file(
     Returns:
         AnalysisResult with BPM, energy score, and detected segments
     """
-    if librosa is None:
-        raise ImportError("librosa is required for audio analysis")
-    
     # Use settings defaults if not specified
     min_segment_duration = min_segment_duration or settings.min_segment_duration
     max_segment_duration = max_segment_duration or settings.max_segment_duration
     max_segments = max_segments or settings.max_segments_per_song
     
-    print(f"  Loading audio: {audio_path}")
-    
-    # Load audio file
     # Use a lower sample rate for faster processing
-    y, sr = librosa.load(audio_path, sr=22050, mono=True)
-    
-    print(f"  Detecting BPM...")
-    bpm = detect_bpm(y, sr)
-    
-    print(f"  Calculating energy curve...")
+    sr = 22050
     hop_length = 512
-    energy_curve = calculate_energy_curve(y, sr, hop_length)
     
-    overall_energy = float(np.mean(energy_curve) * 100)
+    # An unchanged file reuses its BPM and energy curve
+    cache_key = analysis_cache_key(audio_path)
+    cached = get_cached_analysis(cache_key)
+    if cached is not None:
+        print(f"  Using cached analysis: {audio_path}")
+        bpm, overall_energy, energy_curve = cached
+    else:
+        if librosa is None:
+            raise ImportError("librosa is required for audio analysis")
+        
+        print(f"  Loading audio: {audio_path}")
+        y, sr = librosa.load(audio_path, sr=sr, mono=True, dtype=np.float32)
+        
+        print(f"  Detecting BPM...")
+        bpm = detect_bpm(y, sr)
+        
+        print(f"  Calculating energy curve...")
+        energy_curve = calculate_energy_curve(y, sr, hop_length)
+        
+        overall_energy = float(np.mean(energy_curve) * 100)
+        cache_analysis(cache_key, bpm, overall_energy, energy_curve)
     
     print(f"  Finding high-energy segments...")
     segments = find_peak_segments(
@@ -266,6 +280,23 @@ def analyze_audio_file(
     )
 
 
+def segments_to_insert_rows(song_id: str, segments: List[DetectedSegment]) -> List[dict]:
+    """Build Segment table rows for one bulk INSERT of a song's detected segments."""
+    return [
+        {
+            "id": uuid.uuid4().hex,
+            "song_id": song_id,
+            "start_time": seg.start_time,
+            "end_time": seg.end_time,
+            "duration": seg.duration,
+            "energy_score": seg.energy_score,
+            "is_primary": seg.is_primary,
+            "label": seg.label,
+        }
+        for seg in segments
+    ]
+
+
 # For testing
 if __name__ == "__main__":
     import sys
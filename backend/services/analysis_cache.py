@@ -0,0 +1,86 @@
+"""
+Audio Analysis Cache - Remembers the expensive part of analyze_audio_file.
+
+Decoding, BPM tracking and the energy curve are stored in the
+analysis_cache table, keyed by the audio file's path, size and mtime, so
+re-analyzing an unchanged file skips librosa entirely. Segment detection
+runs on the cached curve, since it depends on per-call duration limits.
+"""
+
+import hashlib
+import os
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+from sqlalchemy.dialects.sqlite import insert
+
+from models.database import AnalysisCache, new_session
+
+_warned_no_database = False
+
+
+def _open_session():
+    """Open a session, or return None (warning once) if no database is set up."""
+    global _warned_no_database
+    try:
+        return new_session()
+    except RuntimeError as e:
+        if not _warned_no_database:
+            _warned_no_database = True
+            print(f"[ANALYSIS_CACHE] Disabled in this process: {e}")
+        return None
+
+
+def analysis_cache_key(audio_path: str) -> str:
+    """Cache key for an audio file; changes whenever the file is rewritten."""
+    stat = os.stat(audio_path)
+    raw = f"{os.path.abspath(audio_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def get_cached_analysis(key: str) -> Optional[Tuple[float, float, np.ndarray]]:
+    """Return (bpm, overall_energy, energy_curve) for a key, or None."""
+    session = _open_session()
+    if session is None:
+        return None
+    try:
+        row = session.get(AnalysisCache, key)
+        if row is None:
+            return None
+        curve = np.frombuffer(row.energy_curve, dtype=np.float32).copy()
+        return row.bpm, row.overall_energy, curve
+    except Exception as e:
+        print(f"[ANALYSIS_CACHE] Lookup failed: {e}")
+        return None
+    finally:
+        session.close()
+
+
+def cache_analysis(key: str, bpm: float, overall_energy: float, energy_curve: np.ndarray):
+    """Store the BPM, overall energy and energy curve for a key."""
+    values = {
+        "audio_hash": key,
+        "bpm": float(bpm),
+        "overall_energy": float(overall_energy),
+        "energy_curve": np.ascontiguousarray(energy_curve, dtype=np.float32).tobytes(),
+        "cached_at": time.time(),
+    }
+
+    session = _open_session()
+    if session is None:
+        return
+    try:
+        stmt = insert(AnalysisCache).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AnalysisCache.audio_hash],
+            set_={k: v for k, v in values.items() if k != "audio_hash"},
+        )
+        session.execute(stmt)
+        session.commit()
+    except Exception as e:
+        # The cache is best effort; a locked database shouldn't fail the analysis
+        session.rollback()
+        print(f"[ANALYSIS_CACHE] Store failed: {e}")
+    finally:
+        session.close()
@@ -9,12 +9,13 @@ import os
 import sys
 import json
 import asyncio
-import tempfile
 import subprocess
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Callable
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add parent to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -36,6 +37,16 @@ try:
 except ImportError:
     YT_DLP_AVAILABLE = False
 
+# Concurrent YouTube downloads in generate_from_prompt (network bound)
+DOWNLOAD_WORKERS = max(1, int(os.getenv("DL_WORKERS", "6")))
+
+# Songs whose audio is extracted ahead of the one being analyzed
+ANALYSIS_PREFETCH = 2
+
+# Analysis audio: ffmpeg decodes mono 16-bit PCM at this rate into a pipe
+ANALYSIS_SAMPLE_RATE = 22050
+PCM_PIPE_BUFFER = 1 << 20
+
 
 @dataclass
 class DownloadedSong:
@@ -150,13 +161,6 @@ class AutoPlaylistGenerator:
                                 video_path = str(potential)
                                 break
                         
-                        if not video_path:
-                            # Try to find by pattern
-                            for f in self.downloads_dir.glob(f"{safe_name}*"):
-                                if f.suffix in ['.mp4', '.webm', '.mkv']:
-                                    video_path = str(f)
-                                    break
-                        
                         if not video_path:
                             self.log(f"    [FAIL] Downloaded file not found")
                             return None
@@ -384,7 +388,25 @@ class AutoPlaylistGenerator:
             print(f"[AUTO_PLAYLIST]     [PHRASE] Phrase detection failed: {e}")
             return target_time
 
-    def analyze_song(self, song: DownloadedSong) -> DownloadedSong:
+    def _extract_audio(self, song: DownloadedSong) -> "np.ndarray":
+        """Decode a song's audio straight from ffmpeg's stdout into mono float32 samples"""
+        # Analyze up to 3 minutes (user-requested optimization)
+        analyze_duration = min(180, song.duration)
+        cmd = [
+            'ffmpeg', '-i', song.video_path,
+            '-vn', '-f', 's16le', '-acodec', 'pcm_s16le', '-ar', str(ANALYSIS_SAMPLE_RATE), '-ac', '1',
+            '-t', str(analyze_duration),
+            'pipe:1'
+        ]
+        proc = subprocess.run(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            timeout=60, bufsize=PCM_PIPE_BUFFER
+        )
+        samples = np.frombuffer(proc.stdout, dtype='<i2').astype(np.float32)
+        samples *= 1.0 / 32768.0
+        return samples
+    
+    def analyze_song(self, song: DownloadedSong, samples: Optional["np.ndarray"] = None) -> DownloadedSong:
         """
         Analyze a song for BPM, energy, and find best HIGH-ENERGY segment.
         
@@ -443,23 +465,12 @@ class AutoPlaylistGenerator:
             return song
         
         try:
-            # Extract audio for analysis - analyze first 3 minutes for speed
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmp:
-                audio_path = tmp.name
-            
-            # Analyze up to 3 minutes (user-requested optimization)
-            analyze_duration = min(180, song.duration)
-            cmd = [
-                'ffmpeg', '-y', '-i', song.video_path,
-                '-vn', '-acodec', 'pcm_s16le', '-ar', '22050', '-ac', '1',
-                '-t', str(analyze_duration),
-                audio_path
-            ]
-            subprocess.run(cmd, capture_output=True, timeout=60)
+            # Decode audio for analysis unless it was prefetched
+            if samples is None:
+                samples = self._extract_audio(song)
             
-            if Path(audio_path).exists():
-                # Load and analyze
-                y, sr = librosa.load(audio_path, sr=22050, duration=analyze_duration)
+            if len(samples):
+                y, sr = samples, ANALYSIS_SAMPLE_RATE
                 
                 # Detect BPM and beat times for phrase-aligned cuts
                 tempo, beat_frames = librosa.beat.beat_track(y=y, sr=sr)
@@ -484,16 +495,18 @@ class AutoPlaylistGenerator:
                 window_seconds = seg_duration
                 window_size = int(window_seconds * sr / hop_length)
                 
-                # Calculate audio energy scores for each position
+                # Calculate audio energy scores for each position; every
+                # window sum is a difference of two prefix sums
                 audio_best_start = 0
                 audio_max_energy = 0
+                rms_csum = np.concatenate(([0.0], np.cumsum(rms, dtype=np.float64)))
                 
                 if len(rms) > window_size:
-                    for i in range(len(rms) - window_size):
-                        window_energy = np.sum(rms[i:i+window_size])
-                        if window_energy > audio_max_energy:
-                            audio_max_energy = window_energy
-                            audio_best_start = i * hop_length / sr
+                    window_energy = rms_csum[window_size:len(rms)] - rms_csum[:len(rms) - window_size]
+                    best_frame = int(np.argmax(window_energy))
+                    if window_energy[best_frame] > 0:
+                        audio_max_energy = float(window_energy[best_frame])
+                        audio_best_start = best_frame * hop_length / sr
                 
                 # HYBRID DECISION: Combine YouTube heatmap with audio energy
                 if heatmap_segment and audio_max_energy > 0:
@@ -504,7 +517,7 @@ class AutoPlaylistGenerator:
                     # Calculate audio energy at heatmap's suggested position
                     heatmap_frame = int(heatmap_start * sr / hop_length)
                     if heatmap_frame + window_size < len(rms):
-                        heatmap_audio_energy = np.sum(rms[heatmap_frame:heatmap_frame + window_size])
+                        heatmap_audio_energy = rms_csum[heatmap_frame + window_size] - rms_csum[heatmap_frame]
                         heatmap_audio_ratio = heatmap_audio_energy / audio_max_energy
                     else:
                         heatmap_audio_ratio = 0.5
@@ -555,9 +568,8 @@ class AutoPlaylistGenerator:
                 if song.best_segment_end > song.duration:
                     song.best_segment_start = max(0, song.duration - seg_duration)
                     song.best_segment_end = song.best_segment_start + seg_duration
-                
-                # Clean up
-                Path(audio_path).unlink(missing_ok=True)
+            else:
+                raise RuntimeError("ffmpeg produced no audio")
                 
         except Exception as e:
             print(f"[AUTO_PLAYLIST] Analysis error for {song.original.title}: {e}")
@@ -575,6 +587,39 @@ class AutoPlaylistGenerator:
         
         return song
     
+    def _analyze_songs(self, songs: List[DownloadedSong]):
+        """
+        Analyze songs in order, yielding each one as it finishes.
+        
+        ffmpeg decoding for the next songs runs in background threads while
+        librosa works on the current one, at most ANALYSIS_PREFETCH ahead.
+        """
+        if not LIBROSA_AVAILABLE:
+            # Nothing to extract: analysis falls back to heuristics
+            for song in songs:
+                yield self.analyze_song(song)
+            return
+        
+        upcoming = iter(songs)
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=ANALYSIS_PREFETCH) as extract_pool:
+            def prefetch():
+                song = next(upcoming, None)
+                if song is not None:
+                    pending.append((song, extract_pool.submit(self._extract_audio, song)))
+            
+            for _ in range(ANALYSIS_PREFETCH):
+                prefetch()
+            while pending:
+                song, extraction = pending.popleft()
+                prefetch()
+                try:
+                    samples = extraction.result()
+                except Exception as e:
+                    print(f"[AUTO_PLAYLIST] Audio extraction failed for {song.original.title}: {e}")
+                    samples = None
+                yield self.analyze_song(song, samples)
+    
     def create_mix_order(self, songs: List[DownloadedSong]) -> List[DownloadedSong]:
         """Order songs for optimal DJ flow based on BPM and energy"""
         if not songs:
@@ -662,12 +707,29 @@ class AutoPlaylistGenerator:
                 result.error = "No songs found on YouTube"
                 return result
             
+            # Downloads are network bound, so run several at once; results
+            # keep the plan's order for the analysis and mix steps. A video
+            # the plan lists twice is downloaded once, so no two workers
+            # ever write the same file
+            first_index: Dict[str, int] = {}
+            for i, song in enumerate(songs_with_url):
+                first_index.setdefault(song.youtube_url, i)
+            total = len(first_index)
+            results: Dict[int, Optional[DownloadedSong]] = {}
+            with ThreadPoolExecutor(max_workers=min(DOWNLOAD_WORKERS, total)) as pool:
+                futures = {
+                    pool.submit(self.download_song, songs_with_url[i], n + 1, total): i
+                    for n, i in enumerate(first_index.values())
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    results[futures[future]] = future.result()
+                    self.log(f"  Finished {done}/{total} downloads", 0.15 + (0.45 * done / total))
             downloaded_songs: List[DownloadedSong] = []
             for i, song in enumerate(songs_with_url):
-                progress = 0.15 + (0.45 * i / len(songs_with_url))
-                downloaded = self.download_song(song, i+1, len(songs_with_url))
-                if downloaded:
-                    downloaded_songs.append(downloaded)
+                first = first_index[song.youtube_url]
+                if results[first]:
+                    # Repeats share the first download's file under their own entry
+                    downloaded_songs.append(results[first] if first == i else replace(results[first], original=song))
             
             if not downloaded_songs:
                 result.error = "Failed to download any songs"
@@ -678,8 +740,7 @@ class AutoPlaylistGenerator:
             
             # Step 3: Analyze songs
             self.log("[ANALYZE] Analyzing songs for BPM and energy...", 0.62)
-            for i, song in enumerate(downloaded_songs):
-                self.analyze_song(song)
+            for i, song in enumerate(self._analyze_songs(downloaded_songs)):
                 self.log(f"  {song.original.title}: {song.bpm:.0f} BPM, Energy {song.energy:.0%}", 
                         0.62 + (0.08 * i / len(downloaded_songs)))
             
@@ -727,6 +788,7 @@ class AutoPlaylistGenerator:
         """Create database entries for songs and segments, return playlist ID"""
         import sqlite3
         import uuid
+        from models.database import mark_changed
         
         db_path = Path(__file__).parent.parent.parent / "database.sqlite"
         conn = sqlite3.connect(str(db_path))
@@ -790,7 +852,7 @@ class AutoPlaylistGenerator:
         ''')
         
         # Create playlist (standard columns only - theme/notes stored in export config)
-        playlist_id = str(uuid.uuid4())
+        playlist_id = uuid.uuid4().hex
         cursor.execute(
             'INSERT INTO playlists (id, name) VALUES (?, ?)',
             (playlist_id, f"AI Mix: {plan.theme}")
@@ -800,7 +862,7 @@ class AutoPlaylistGenerator:
         
         for position, song in enumerate(songs):
             # Create or get song entry - using actual database schema
-            song_id = str(uuid.uuid4())
+            song_id = uuid.uuid4().hex
             youtube_url = f"https://www.youtube.com/watch?v={song.original.youtube_id}" if song.original.youtube_id else ""
             
             cursor.execute('''
@@ -820,7 +882,7 @@ class AutoPlaylistGenerator:
             
             # Create segment entry - using the pre-calculated best segment from analyze_song
             # which already has energy-based duration (45-90s)
-            segment_id = str(uuid.uuid4())
+            segment_id = uuid.uuid4().hex
             start_time = song.best_segment_start
             end_time = song.best_segment_end
             segment_duration_actual = end_time - start_time
@@ -837,7 +899,7 @@ class AutoPlaylistGenerator:
             ''', (segment_id, song_id, start_time, end_time, segment_duration_actual, song.energy, 1))
             
             # Add to playlist - using actual table name: playlist_items
-            ps_id = str(uuid.uuid4())
+            ps_id = uuid.uuid4().hex
             cursor.execute('''
                 INSERT INTO playlist_items (id, playlist_id, segment_id, position)
                 VALUES (?, ?, ?, ?)
@@ -847,6 +909,9 @@ class AutoPlaylistGenerator:
         
         conn.commit()
         conn.close()
+        # Raw sqlite3 writes don't move the ORM's data versions; invalidate
+        # the cached song lists and suggestions by hand
+        mark_changed("library", "playlists")
         
         self.log(f"  Created playlist {playlist_id} with {len(segment_ids)} segments")
         return playlist_id, songs  # Return songs too for export
@@ -932,6 +997,12 @@ class AutoPlaylistGenerator:
         return None
 
 
+def analyze_downloaded_song(song: DownloadedSong, downloads_dir: str, exports_dir: str) -> DownloadedSong:
+    """Analyze one song in a worker process (generators hold callbacks and can't be pickled)"""
+    generator = AutoPlaylistGenerator(downloads_dir=downloads_dir, exports_dir=exports_dir, progress_callback=None)
+    return generator.analyze_song(song)
+
+
 async def generate_playlist_async(
     prompt: str,
     target_duration: int = 30,
@@ -10,6 +10,7 @@ import logging
 import subprocess
 import tempfile
 import json
+import threading
 import time
 from pathlib import Path
 from dataclasses import dataclass, field
@@ -116,29 +117,45 @@ class CreativeDJComment:
     voice_style: str = "energetic"
 
 
+# One client for the whole process so its connection pool (and TLS
+# sessions) are reused across requests; openai clients are thread-safe
+_azure_client = None
+_azure_client_lock = threading.Lock()
+
+
 def get_azure_openai_client():
-    """Get Azure OpenAI client if available, using AAD authentication."""
-    global _azure_credential, _AzureOpenAI
+    """Get the shared Azure OpenAI client if available, using AAD authentication."""
+    global _azure_client
     
     if not AZURE_OPENAI_AVAILABLE or not _AzureOpenAI or not _azure_credential:
         return None
     
-    try:
-        from azure.identity import get_bearer_token_provider
-        token_provider = get_bearer_token_provider(
-            _azure_credential,
-            "https://cognitiveservices.azure.com/.default"
-        )
-        
-        client = _AzureOpenAI(
-            api_version="2025-01-01-preview",
-            azure_endpoint=AZURE_OPENAI_ENDPOINT,
-            azure_ad_token_provider=token_provider
-        )
-        return client
-    except Exception as e:
-        log(f"[AZURE_DJ] Failed to create Azure OpenAI client: {e}")
-        return None
+    if _azure_client is not None:
+        return _azure_client
+    
+    with _azure_client_lock:
+        if _azure_client is None:
+            try:
+                import httpx
+                from azure.identity import get_bearer_token_provider
+                token_provider = get_bearer_token_provider(
+                    _azure_credential,
+                    "https://cognitiveservices.azure.com/.default"
+                )
+                
+                _azure_client = _AzureOpenAI(
+                    api_version="2025-01-01-preview",
+                    azure_endpoint=AZURE_OPENAI_ENDPOINT,
+                    azure_ad_token_provider=token_provider,
+                    http_client=httpx.Client(
+                        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+                    )
+                )
+            except Exception as e:
+                # Not cached, so the next call retries
+                log(f"[AZURE_DJ] Failed to create Azure OpenAI client: {e}")
+                return None
+        return _azure_client
 
 
 def extract_song_metadata(song_info: Dict) -> SongMetadata:
@@ -747,6 +764,17 @@ def add_creative_dj_commentary_to_video(
     temp_dir = Path(tempfile.mkdtemp())
     
     try:
+        # Generate creative commentary using GPT; with nothing to say there
+        # is no need to probe the video
+        report_progress("Generating DJ script", "AI is writing your commentary...")
+        comments = generate_creative_commentary_with_gpt(segments, context, frequency)
+        
+        if not comments:
+            log("[AZURE_DJ] No comments generated!")
+            import shutil
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return False, timeline
+        
         # Get video duration
         report_progress("Analyzing video", "Getting duration...")
         video_dur, audio_dur = get_stream_durations(video_path)
@@ -757,14 +785,6 @@ def add_creative_dj_commentary_to_video(
         
         log(f"[AZURE_DJ] Video duration: {video_duration:.2f}s")
         
-        # Generate creative commentary using GPT
-        report_progress("Generating DJ script", "AI is writing your commentary...")
-        comments = generate_creative_commentary_with_gpt(segments, context, frequency)
-        
-        if not comments:
-            log("[AZURE_DJ] No comments generated!")
-            return False, timeline
-        
         report_progress("Planning DJ moments", f"Prepared {len(comments)} commentary spots")
         
         # Build segment timing map - use actual video_start_time if available
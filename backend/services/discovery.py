@@ -3,6 +3,7 @@ Discovery service - finds popular dance songs on YouTube.
 """
 
 import re
+import asyncio
 from typing import List, Optional
 from dataclasses import dataclass
 import yt_dlp
@@ -239,6 +240,36 @@ def discover_all_songs(
     return results
 
 
+async def discover_all_songs_async(
+    languages: Optional[List[str]] = None,
+    songs_per_language: int = 3,
+    max_concurrency: int = 4
+) -> dict[str, List[DiscoveredSong]]:
+    """
+    Discover songs for several languages concurrently.
+    Each language's yt-dlp searches run in a worker thread; at most
+    max_concurrency languages query YouTube at the same time.
+    """
+    if languages is None:
+        languages = SUPPORTED_LANGUAGES
+    
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def discover_language(language: str) -> List[DiscoveredSong]:
+        async with semaphore:
+            print(f"Discovering {songs_per_language} songs for {language}...")
+            try:
+                songs = await asyncio.to_thread(discover_songs_for_language, language, songs_per_language)
+                print(f"  Found {len(songs)} songs for {language}")
+                return songs
+            except Exception as e:
+                print(f"  Error discovering songs for {language}: {e}")
+                return []
+    
+    found = await asyncio.gather(*(discover_language(language) for language in languages))
+    return dict(zip(languages, found))
+
+
 # For testing
 if __name__ == "__main__":
     print("Testing discovery service...")
@@ -10,6 +10,7 @@ import logging
 import shutil
 import datetime
 import sys
+import threading
 from pathlib import Path
 from typing import List, Optional, Callable
 from dataclasses import dataclass
@@ -74,6 +75,37 @@ class ExportProgress:
     error: Optional[str] = None
 
 
+class ExportCancelled(Exception):
+    """Raised inside an export when its cancel event has been set."""
+
+
+# How often a running ffmpeg checks whether its export was cancelled
+CANCEL_POLL_INTERVAL = 0.5
+
+
+def run_ffmpeg(cmd: List[str], cancel_event: Optional[threading.Event] = None) -> subprocess.CompletedProcess:
+    """
+    Run an ffmpeg/ffprobe command like subprocess.run(capture_output=True, text=True).
+    
+    If cancel_event is set while it runs, the process is killed and
+    ExportCancelled is raised.
+    """
+    if cancel_event is None:
+        return subprocess.run(cmd, capture_output=True, text=True)
+    
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True) as proc:
+        while True:
+            try:
+                stdout, stderr = proc.communicate(timeout=CANCEL_POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                if cancel_event.is_set():
+                    proc.kill()
+                    proc.communicate()
+                    raise ExportCancelled()
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+
 @dataclass
 class ExportResult:
     """Result of export operation."""
@@ -267,6 +299,10 @@ def create_outro_clip(
         return False
 
 
+# Segments that a later pass re-encodes only need to be fast and near-lossless
+INTERMEDIATE_X264_ARGS = ['-preset', 'ultrafast', '-crf', '16']
+
+
 def extract_and_overlay_segment(
     video_path: Path,
     output_path: Path,
@@ -277,9 +313,20 @@ def extract_and_overlay_segment(
     language: str = None,
     add_overlay: bool = True,
     width: int = 1280,
-    height: int = 720
+    height: int = 720,
+    threads: Optional[int] = None,
+    cancel_event: Optional[threading.Event] = None,
+    intermediate: bool = False
 ) -> bool:
-    """Extract a segment from video and optionally add text overlay."""
+    """
+    Extract a segment from video and optionally add text overlay.
+    
+    Pass threads to cap ffmpeg's encoder threads when several segments are
+    encoded at once, and cancel_event to kill ffmpeg when the export is
+    cancelled (raises ExportCancelled). Set intermediate when the segment
+    will be re-encoded by a later pass anyway: it is then encoded with
+    INTERMEDIATE_X264_ARGS instead of the final-quality preset.
+    """
     duration = end_time - start_time
     
     # Build filter chain
@@ -293,13 +340,15 @@ def extract_and_overlay_segment(
         
         show_duration = min(6.0, duration - 1)
         alpha_expr = f"if(lt(t,1),t,if(lt(t,{show_duration-1}),1,1-(t-{show_duration-1})))"
+        # The text has faded out by show_duration; stop rendering it there
+        enable_expr = f"lt(t,{show_duration})"
         
         filters.append(
             f"drawtext=text='{escape_ffmpeg_text(title)}':"
             f"fontsize={title_size}:fontcolor=white:"
             f"borderw=2:bordercolor=black@0.7:"
             f"x={padding}:y=h-{padding + artist_size + title_size + 10}:"
-            f"alpha='{alpha_expr}'"
+            f"alpha='{alpha_expr}':enable='{enable_expr}'"
         )
         
         filters.append(
@@ -307,7 +356,7 @@ def extract_and_overlay_segment(
             f"fontsize={artist_size}:fontcolor=white@0.85:"
             f"borderw=1:bordercolor=black@0.6:"
             f"x={padding}:y=h-{padding + artist_size}:"
-            f"alpha='{alpha_expr}'"
+            f"alpha='{alpha_expr}':enable='{enable_expr}'"
         )
         
         if language:
@@ -316,7 +365,7 @@ def extract_and_overlay_segment(
                 f"fontsize={badge_size}:fontcolor=white:"
                 f"box=1:boxcolor=blue@0.7:boxborderw=4:"
                 f"x=w-{padding}-text_w:y={padding}:"
-                f"alpha='{alpha_expr}'"
+                f"alpha='{alpha_expr}':enable='{enable_expr}'"
             )
     
     video_filter = ",".join(filters)
@@ -329,22 +378,27 @@ def extract_and_overlay_segment(
         '-t', str(duration),
         '-vf', f'{video_filter},setpts=PTS-STARTPTS',
         '-af', 'asetpts=PTS-STARTPTS',
-        '-c:v', 'libx264', '-preset', 'fast',
+        '-c:v', 'libx264', *(INTERMEDIATE_X264_ARGS if intermediate else ['-preset', 'fast']),
         '-c:a', 'aac', '-ar', '44100', '-ac', '2',
         '-r', '30',
         '-vsync', 'cfr',
         '-async', '1',
         '-shortest',
-        str(output_path)
     ]
+    if threads:
+        cmd += ['-threads', str(threads)]
+    cmd.append(str(output_path))
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = run_ffmpeg(cmd, cancel_event)
         if result.returncode == 0:
             return True
         else:
             logger.error(f"Failed to extract segment: {result.stderr[:200]}")
             return False
+    except ExportCancelled:
+        Path(output_path).unlink(missing_ok=True)
+        raise
     except Exception as e:
         logger.error(f"Exception extracting segment: {e}")
         return False
@@ -456,6 +510,16 @@ def get_stream_durations(video_path: Path) -> tuple:
     return 0, 0
 
 
+# Transitions supported by ffmpeg's xfade filter that we allow
+XFADE_TRANSITIONS = [
+    'fade', 'fadeblack', 'fadewhite', 'wipeleft', 'wiperight',
+    'wipeup', 'wipedown', 'slideleft', 'slideright', 'slideup',
+    'slidedown', 'circlecrop', 'rectcrop', 'distance', 'smoothleft',
+    'smoothright', 'smoothup', 'smoothdown', 'circleopen', 'circleclose',
+    'dissolve', 'pixelize', 'radial', 'hblur'
+]
+
+
 def create_transition_pair(
     video1: Path,
     video2: Path,
@@ -466,15 +530,7 @@ def create_transition_pair(
     """Create a transition between two video clips with proper A/V sync and extended audio crossfade."""
     print(f"[TRANSITION] Creating transition between {video1.name} and {video2.name}")
     
-    valid_transitions = [
-        'fade', 'fadeblack', 'fadewhite', 'wipeleft', 'wiperight',
-        'wipeup', 'wipedown', 'slideleft', 'slideright', 'slideup',
-        'slidedown', 'circlecrop', 'rectcrop', 'distance', 'smoothleft',
-        'smoothright', 'smoothup', 'smoothdown', 'circleopen', 'circleclose',
-        'dissolve', 'pixelize', 'radial', 'hblur'
-    ]
-    
-    if transition_type not in valid_transitions:
+    if transition_type not in XFADE_TRANSITIONS:
         transition_type = 'fade'
     
     # Get BOTH video and audio durations to ensure sync
@@ -568,13 +624,93 @@ def create_transition_pair(
         return simple_concat([video1, video2], output_path)
 
 
+def build_xfade_filter(
+    durations: List[float],
+    transitions: List[str],
+    transition_duration: float
+) -> str:
+    """
+    Build a filtergraph crossfading N clips in sequence, with the same timing
+    as chaining create_transition_pair over them. Outputs [v] and [a].
+    """
+    parts = []
+    for i, dur in enumerate(durations):
+        parts.append(f"[{i}:v]trim=0:{dur},setpts=PTS-STARTPTS,fps=30[v{i}]")
+        parts.append(f"[{i}:a]atrim=0:{dur},asetpts=PTS-STARTPTS[a{i}]")
+    
+    video_label, audio_label = "v0", "a0"
+    mix_duration = durations[0]
+    for i in range(1, len(durations)):
+        trans = transitions[i - 1] if transitions[i - 1] in XFADE_TRANSITIONS else 'fade'
+        # Same bounds as create_transition_pair, where the first clip is the mix so far
+        fade = max(2.0, min(transition_duration, mix_duration * 0.4, durations[i] * 0.4))
+        offset = max(0, mix_duration - fade)
+        out = "v" if i == len(durations) - 1 else f"vx{i}"
+        aout = "a" if i == len(durations) - 1 else f"ax{i}"
+        parts.append(f"[{video_label}][v{i}]xfade=transition={trans}:duration={fade}:offset={offset}[{out}]")
+        parts.append(f"[{audio_label}][a{i}]acrossfade=d={fade}:c1=tri:c2=tri[{aout}]")
+        video_label, audio_label = out, aout
+        mix_duration = offset + durations[i]
+    
+    return ";".join(parts)
+
+
+def create_xfade_chain(
+    video_files: List[Path],
+    output_path: Path,
+    transitions: List[str],
+    transition_duration: float = 3.5,
+    cancel_event: Optional[threading.Event] = None
+) -> bool:
+    """Crossfade all clips into output_path with a single ffmpeg encode."""
+    durations = []
+    for video_file in video_files:
+        v_dur, a_dur = get_stream_durations(video_file)
+        dur = min(v_dur, a_dur) if v_dur > 0 and a_dur > 0 else max(v_dur, a_dur)
+        if dur <= 0:
+            return False
+        durations.append(dur)
+    
+    cmd = [FFMPEG, '-y']
+    for video_file in video_files:
+        cmd += ['-i', str(video_file)]
+    cmd += [
+        '-filter_complex', build_xfade_filter(durations, transitions, transition_duration),
+        '-map', '[v]', '-map', '[a]',
+        '-c:v', 'libx264', '-preset', 'fast',
+        '-c:a', 'aac', '-ar', '44100', '-ac', '2',
+        '-vsync', 'cfr', '-r', '30',
+        str(output_path)
+    ]
+    
+    try:
+        result = run_ffmpeg(cmd, cancel_event)
+        if result.returncode == 0 and output_path.exists():
+            final_v, final_a = get_stream_durations(output_path)
+            print(f"[TRANSITION_CONCAT] Single pass output: v={final_v:.2f}s, a={final_a:.2f}s")
+            return True
+        print(f"[TRANSITION_CONCAT] Single pass failed: {result.stderr[-300:]}")
+    except ExportCancelled:
+        output_path.unlink(missing_ok=True)
+        raise
+    except Exception as e:
+        print(f"[TRANSITION_CONCAT] Single pass exception: {e}")
+    return False
+
+
 def create_transition_concat(
     video_files: List[Path],
     output_path: Path,
     transition_type: str = "random",
-    transition_duration: float = 3.5
+    transition_duration: float = 3.5,
+    cancel_event: Optional[threading.Event] = None
 ) -> bool:
-    """Concatenate multiple videos with extended crossfade transitions for smooth music blending."""
+    """
+    Concatenate multiple videos with extended crossfade transitions for smooth music blending.
+    
+    With cancel_event, the single-pass encode is killed on cancel and
+    ExportCancelled is raised instead of falling back.
+    """
     print(f"[TRANSITION_CONCAT] Starting with {len(video_files)} files, crossfade={transition_duration}s")
     
     if len(video_files) == 0:
@@ -601,6 +737,16 @@ def create_transition_concat(
         'smoothright',   # Smooth horizontal other way
     ]
     
+    # One ffmpeg pass over every clip; the pairwise chain below re-encodes the
+    # growing mix once per transition, so it is only the fallback
+    chosen = [
+        transitions[i % len(transitions)] if transition_type == "random" else transition_type
+        for i in range(len(video_files) - 1)
+    ]
+    if create_xfade_chain(video_files, output_path, chosen, transition_duration, cancel_event):
+        return True
+    print("[TRANSITION_CONCAT] Single-pass crossfade failed, chaining transitions pairwise")
+    
     temp_dir = Path(tempfile.mkdtemp())
     current_video = video_files[0]
     
@@ -675,7 +821,8 @@ def export_playlist(
     dj_voice: str = "energetic_male",
     dj_frequency: str = "moderate",
     dj_context: dict = None,  # New: DJ context with theme, mood, etc.
-    progress_callback: Callable[[ExportProgress], None] = None
+    progress_callback: Callable[[ExportProgress], None] = None,
+    cancel_event: Optional[threading.Event] = None
 ) -> ExportResult:
     """
     Export a playlist of video segments into a single video.
@@ -692,6 +839,7 @@ def export_playlist(
         dj_frequency: How often DJ speaks
         dj_context: Context for DJ (theme, mood, shoutouts) - uses Azure OpenAI GPT
         progress_callback: Callback for progress updates
+        cancel_event: Set by another thread to stop the export between steps
     
     Returns:
         ExportResult with success status and output path
@@ -727,6 +875,10 @@ def export_playlist(
             ))
         logger.info(f"[{progress:.1f}%] {step}")
     
+    def check_cancelled():
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExportCancelled()
+    
     try:
         # Step 1: Create intro
         update_progress("processing", 5, "Creating intro...", 0)
@@ -736,6 +888,7 @@ def export_playlist(
         
         # Step 2: Download and process each segment
         for i, segment in enumerate(segments):
+            check_cancelled()
             progress = 10 + (i / len(segments)) * 70  # 10% to 80%
             song_name = segment.song_title[:30] if segment.song_title else f"Song {i+1}"
             update_progress("downloading", progress, f"Downloading: {song_name} ({i+1}/{len(segments)})", i)
@@ -767,7 +920,8 @@ def export_playlist(
                 segment.artist,
                 segment.language,
                 add_text_overlay,
-                width, height
+                width, height,
+                cancel_event=cancel_event
             )
             
             if success:
@@ -779,6 +933,8 @@ def export_playlist(
             shutil.rmtree(temp_dir, ignore_errors=True)
             return ExportResult(success=False, error="No segments were successfully processed")
         
+        check_cancelled()
+        
         # Step 3: Create outro
         update_progress("processing", 82, "Creating outro clip...", len(segments))
         outro_path = temp_dir / "outro.mp4"
@@ -793,7 +949,8 @@ def export_playlist(
                 segment_files,
                 output_path,
                 transition_type,
-                crossfade_duration
+                crossfade_duration,
+                cancel_event=cancel_event
             )
         else:
             success = simple_concat(segment_files, output_path)
@@ -802,6 +959,8 @@ def export_playlist(
             shutil.rmtree(temp_dir, ignore_errors=True)
             return ExportResult(success=False, error="Failed to concatenate segments")
         
+        check_cancelled()
+        
         # Step 5: Add DJ voice if enabled
         dj_timeline = []
         if dj_enabled:
@@ -996,6 +1155,12 @@ def export_playlist(
             file_size_bytes=file_size
         )
         
+    except ExportCancelled:
+        logger.info("Export cancelled")
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        output_path.unlink(missing_ok=True)
+        return ExportResult(success=False, error="Export cancelled")
+        
     except Exception as e:
         logger.error(f"Export failed: {e}")
         shutil.rmtree(temp_dir, ignore_errors=True)
@@ -0,0 +1,182 @@
+"""
+Export Job Store - Checkpoints export job state to disk so it survives restarts.
+
+Snapshots are appended to a JSON-lines log. On startup the log is replayed,
+keeping the last snapshot per job, and compacted.
+
+When REDIS_URL is set (and redis is installed) snapshots go to one Redis hash
+per job instead, so every uvicorn worker can answer status polls for jobs
+running in another worker.
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import settings
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Failures a checkpoint write swallows (redis errors only exist with redis)
+_CHECKPOINT_ERRORS = (redis.RedisError, OSError) if REDIS_AVAILABLE else (OSError,)
+
+# Progress checkpoints are batched: at most one every CHECKPOINT_INTERVAL
+# seconds per job, unless CHECKPOINT_SEGMENTS segments completed or the
+# status changed since the last one.
+CHECKPOINT_INTERVAL = 2.0
+CHECKPOINT_SEGMENTS = 10
+
+# Export statuses after which a job never changes again
+TERMINAL_STATUSES = frozenset({"complete", "failed", "cancelled", "interrupted"})
+
+# Redis keys expire a day after the last checkpoint
+JOB_TTL_SECONDS = 24 * 60 * 60
+REDIS_KEY_PREFIX = "dj-genie:export-job:"
+
+_lock = threading.Lock()
+_last_checkpoint: Dict[str, tuple] = {}
+_redis_client = None
+
+
+def get_job_log_path() -> Path:
+    """Get the path of the export job checkpoint log."""
+    return settings.cache_dir / "export_jobs.jsonl"
+
+
+def get_redis():
+    """Get the shared Redis client, or None when Redis is not configured."""
+    global _redis_client
+    if not (REDIS_AVAILABLE and settings.redis_url):
+        return None
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+    return _redis_client
+
+
+def _write_redis(client, job_id: str, snapshot: dict):
+    """Store a job snapshot as a Redis hash of JSON-encoded fields."""
+    key = REDIS_KEY_PREFIX + job_id
+    fields = {k: json.dumps(v, default=str) for k, v in snapshot.items()}
+    pipe = client.pipeline()
+    pipe.hset(key, mapping=fields)
+    pipe.expire(key, JOB_TTL_SECONDS)
+    pipe.execute()
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    """
+    Fetch a job checkpointed by any worker.
+
+    Only Redis is shared between workers; with the file log the in-process
+    job dict is already authoritative, so this returns None.
+    """
+    client = get_redis()
+    if client is None:
+        return None
+    fields = client.hgetall(REDIS_KEY_PREFIX + job_id)
+    if not fields:
+        return None
+    return {k: json.loads(v) for k, v in fields.items()}
+
+
+def checkpoint_job(job_id: str, job: dict, force: bool = False) -> bool:
+    """
+    Append a snapshot of an export job to the checkpoint log.
+
+    Args:
+        job_id: Export job ID
+        job: Current job state (must be JSON-serializable)
+        force: Write even if a checkpoint was taken recently
+
+    Returns:
+        True if a snapshot was written
+    """
+    # Copy first: the export thread keeps mutating the live dict
+    snapshot = dict(job)
+    status = snapshot.get("status")
+    segment_index = snapshot.get("segment_index") or 0
+    now = time.monotonic()
+
+    with _lock:
+        last = _last_checkpoint.get(job_id)
+        if not force and status not in TERMINAL_STATUSES and last is not None:
+            last_time, last_status, last_segment = last
+            if (
+                status == last_status
+                and now - last_time < CHECKPOINT_INTERVAL
+                and segment_index - last_segment < CHECKPOINT_SEGMENTS
+            ):
+                return False
+
+        client = get_redis()
+        written = True
+        try:
+            if client is not None:
+                _write_redis(client, job_id, snapshot)
+            else:
+                path = get_job_log_path()
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"job_id": job_id, "job": snapshot}, default=str) + "\n")
+        except _CHECKPOINT_ERRORS as e:
+            # Checkpoints are a side channel; a Redis outage or a full or
+            # read-only disk must not fail the export itself
+            print(f"[JOB_STORE] Checkpoint of job {job_id} failed: {e}")
+            written = False
+
+        # Throttle retries after a failure the same as successful writes
+        if status in TERMINAL_STATUSES:
+            _last_checkpoint.pop(job_id, None)
+        else:
+            _last_checkpoint[job_id] = (now, status, segment_index)
+
+    return written
+
+
+def load_jobs() -> Dict[str, dict]:
+    """
+    Restore export jobs from the checkpoint log.
+
+    Jobs that were still running when the server stopped are marked
+    "interrupted" so clients get a final state instead of waiting forever.
+    The log is rewritten with one line per job.
+
+    With Redis nothing is loaded: other workers may still own running jobs,
+    and lookups go through get_job() instead.
+    """
+    if get_redis() is not None:
+        return {}
+
+    path = get_job_log_path()
+    if not path.exists():
+        return {}
+
+    jobs: Dict[str, dict] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                jobs[entry["job_id"]] = entry["job"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                # A torn write from a crash; earlier snapshots still apply
+                continue
+
+    for job in jobs.values():
+        if job.get("status") not in TERMINAL_STATUSES:
+            job["status"] = "interrupted"
+            job["current_step"] = "Interrupted by server restart"
+
+    with _lock:
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for job_id, job in jobs.items():
+                f.write(json.dumps({"job_id": job_id, "job": job}, default=str) + "\n")
+        tmp_path.replace(path)
+
+    return jobs
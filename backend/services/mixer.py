@@ -6,6 +6,8 @@ from dataclasses import dataclass
 from typing import List, Optional, Dict, Tuple
 import random
 
+import numpy as np
+
 
 @dataclass
 class MixableSegment:
@@ -57,6 +59,24 @@ def calculate_energy_transition(energy1: float, energy2: float) -> float:
     return abs(energy1 - energy2)
 
 
+def bpm_distance_matrix(segments: List[MixableSegment]) -> np.ndarray:
+    """
+    calculate_bpm_distance for every pair of segments, as an N x N array.
+    Entry [i, j] is the distance from segments[i] to segments[j].
+    """
+    bpm = np.array([s.bpm if s.bpm is not None else np.nan for s in segments], dtype=np.float64)
+    a = bpm[:, None]
+    b = bpm[None, :]
+    
+    direct_diff = np.abs(a - b)
+    half_diff = np.where(b > a, np.abs(a - b / 2), np.abs(b - a / 2))
+    double_diff = np.where(a < b, np.abs(a * 2 - b), np.abs(b * 2 - a))
+    distance = np.minimum(direct_diff, np.minimum(half_diff * 1.5, double_diff * 1.5))
+    
+    # Unknown BPM on either side propagates NaN; use the default penalty
+    return np.where(np.isnan(distance), 10.0, distance)
+
+
 def optimize_bpm_order(segments: List[MixableSegment]) -> List[MixableSegment]:
     """
     Reorder segments to minimize BPM jumps.
@@ -66,27 +86,24 @@ def optimize_bpm_order(segments: List[MixableSegment]) -> List[MixableSegment]:
         return segments
     
     # Start with a middle-energy segment
-    segments_copy = segments.copy()
-    energies = [s.energy_score for s in segments_copy]
+    energies = [s.energy_score for s in segments]
     avg_energy = sum(energies) / len(energies)
     
     # Find segment closest to average energy
-    closest_idx = min(range(len(segments_copy)), 
-                      key=lambda i: abs(segments_copy[i].energy_score - avg_energy))
+    closest_idx = int(np.argmin(np.abs(np.array(energies) - avg_energy)))
     
-    ordered = [segments_copy.pop(closest_idx)]
+    distances = bpm_distance_matrix(segments)
+    used = np.zeros(len(segments), dtype=bool)
+    used[closest_idx] = True
+    order = [closest_idx]
     
-    # Greedily add nearest BPM neighbor
-    while segments_copy:
-        last = ordered[-1]
-        
-        # Find segment with minimum BPM distance
-        best_idx = min(range(len(segments_copy)),
-                      key=lambda i: calculate_bpm_distance(last.bpm, segments_copy[i].bpm))
-        
-        ordered.append(segments_copy.pop(best_idx))
+    # Greedily add nearest BPM neighbor (argmin keeps the first on ties)
+    for _ in range(len(segments) - 1):
+        best_idx = int(np.argmin(np.where(used, np.inf, distances[order[-1]])))
+        used[best_idx] = True
+        order.append(best_idx)
     
-    return ordered
+    return [segments[i] for i in order]
 
 
 def ensure_language_variety(segments: List[MixableSegment], max_consecutive: int = 2) -> List[MixableSegment]:
@@ -97,40 +114,39 @@ def ensure_language_variety(segments: List[MixableSegment], max_consecutive: int
     if len(segments) <= max_consecutive:
         return segments
     
-    result = []
-    remaining = segments.copy()
-    last_languages = []
-    
-    while remaining:
-        # Find valid candidates (not violating language constraint)
-        valid = []
-        for i, seg in enumerate(remaining):
-            # Count how many of this language are at the end
-            lang_count = sum(1 for lang in last_languages[-max_consecutive+1:] if lang == seg.language)
-            if lang_count < max_consecutive - 1:
-                valid.append(i)
+    # Work on indices into segments; languages become small integer ids
+    language_ids = {}
+    langs = np.array([language_ids.setdefault(s.language, len(language_ids)) for s in segments])
+    distances = bpm_distance_matrix(segments)
+    remaining = np.ones(len(segments), dtype=bool)
+    order = []
+    
+    while len(order) < len(segments):
+        # Count how many of each language are at the end
+        recent = [langs[i] for i in order[-max_consecutive+1:]]
+        recent_counts = np.bincount(recent, minlength=len(language_ids)) if recent else np.zeros(len(language_ids), dtype=int)
+        
+        # Valid candidates don't violate the language constraint
+        valid = remaining & (recent_counts[langs] < max_consecutive - 1)
         
-        if not valid:
+        if not valid.any():
             # No valid candidates, just take the first one with different language if possible
-            for i, seg in enumerate(remaining):
-                if not last_languages or seg.language != last_languages[-1]:
-                    valid.append(i)
-                    break
-            if not valid:
-                valid = [0]  # Fallback to first
+            fallback = remaining & (langs != langs[order[-1]]) if order else remaining
+            if not fallback.any():
+                fallback = remaining  # Fallback to first
+            valid = np.zeros(len(segments), dtype=bool)
+            valid[np.argmax(fallback)] = True
         
         # Among valid candidates, prefer the one with closest BPM to last segment
-        if result:
-            last_bpm = result[-1].bpm
-            best_idx = min(valid, key=lambda i: calculate_bpm_distance(last_bpm, remaining[i].bpm))
+        if order:
+            best_idx = int(np.argmin(np.where(valid, distances[order[-1]], np.inf)))
         else:
-            best_idx = valid[0]
+            best_idx = int(np.argmax(valid))
         
-        seg = remaining.pop(best_idx)
-        result.append(seg)
-        last_languages.append(seg.language)
+        remaining[best_idx] = False
+        order.append(best_idx)
     
-    return result
+    return [segments[i] for i in order]
 
 
 def build_energy_curve(segments: List[MixableSegment], curve_type: str = "peak_middle") -> List[MixableSegment]:
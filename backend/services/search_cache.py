@@ -0,0 +1,110 @@
+"""
+YouTube Search Cache - Remembers which video a search query resolved to.
+
+Results are stored in the youtube_search_cache table for SEARCH_CACHE_TTL
+seconds, so re-exporting a plan skips yt-dlp searches for songs already
+found. A small in-process LRU sits in front to avoid repeat queries within
+one run.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy.dialects.sqlite import insert
+
+from models.database import YouTubeSearchCache, new_session
+
+SEARCH_CACHE_TTL = 24 * 60 * 60
+MEMORY_CACHE_SIZE = 1024
+
+_memory_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s]", " ", query.lower()).split())
+
+
+def query_hash(query: str) -> str:
+    """Cache key for a search query."""
+    return hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()
+
+
+def get_cached_search(query: str) -> Optional[dict]:
+    """Return the cached result for a query, or None if missing or expired."""
+    key = query_hash(query)
+    cutoff = time.time() - SEARCH_CACHE_TTL
+
+    with _memory_lock:
+        entry = _memory_cache.get(key)
+        if entry is not None:
+            if entry[0] > cutoff:
+                _memory_cache.move_to_end(key)
+                return dict(entry[1])
+            del _memory_cache[key]
+
+    session = new_session()
+    try:
+        row = session.get(YouTubeSearchCache, key)
+        if row is None or row.cached_at <= cutoff:
+            return None
+        result = {
+            "id": row.video_id,
+            "title": row.title,
+            "url": row.url,
+            "duration": row.duration or 0,
+        }
+        cached_at = row.cached_at
+    except Exception as e:
+        print(f"[SEARCH_CACHE] Lookup failed: {e}")
+        return None
+    finally:
+        session.close()
+
+    _remember(key, cached_at, result)
+    return dict(result)
+
+
+def cache_search(query: str, result: dict):
+    """Store a search result (dict with id, title, url, duration)."""
+    key = query_hash(query)
+    now = time.time()
+    values = {
+        "query_hash": key,
+        "video_id": result["id"],
+        "title": result.get("title"),
+        "url": result["url"],
+        "duration": int(result.get("duration") or 0),
+        "cached_at": now,
+    }
+
+    session = new_session()
+    try:
+        stmt = insert(YouTubeSearchCache).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[YouTubeSearchCache.query_hash],
+            set_={k: v for k, v in values.items() if k != "query_hash"},
+        )
+        session.execute(stmt)
+        session.commit()
+    except Exception as e:
+        # The cache is best effort; a locked database shouldn't fail the search
+        session.rollback()
+        print(f"[SEARCH_CACHE] Store failed: {e}")
+    finally:
+        session.close()
+
+    _remember(key, now, dict(result))
+
+
+def _remember(key: str, cached_at: float, result: dict):
+    with _memory_lock:
+        _memory_cache[key] = (cached_at, result)
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)